@@ -24,9 +24,14 @@ Metadata
 :Description:   Script and module to extract subtables from given tabular data
 :Dependencies:  
 
+                - ``chardet``
+                - ``fiona``
                 - ``geopandas``
                 - ``numpy``
                 - ``pandas``
+                - ``pyproj``
+                - ``shapely``
+                - ``pyarrow`` (optional, for Parquet and Feather files)
 
 Documentation
 -------------
@@ -49,19 +54,108 @@ To get help on using the ``extract.py`` script, run ``extract.py -h``.
 
 """
 import argparse
+import chardet
+import collections
+import concurrent.futures
+import contextlib
+import fiona
+import functools
 import geopandas as gpd
+import glob
+import hashlib
+import io
+import itertools
+import json
 import numpy as np
+import os
 import os.path
 import pandas as pd
 import pathlib
-import shapely.wkt
+import pyproj
+import re
+import shapely.geometry
 import sys
+import threading
 import zipfile
 
-from typing import List, NoReturn, Optional, Tuple, Union
+from typing import (IO, Any, Callable, Iterator, List, NoReturn, Optional, 
+                    Tuple, Union)
 import warnings; warnings.filterwarnings(
     'ignore', 'GeoSeries.isna', UserWarning)
 
+try: # optional, for .parquet, .geoparquet, .feather and .arrow files
+    import pyarrow
+    import pyarrow.csv
+    import pyarrow.feather
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Number of rows decoded per task when geometrizing large tables in parallel
+GEOMETRIZE_CHUNKSIZE = 100000
+
+# Number of bytes sampled from each of the start, middle and end of a file
+# when detecting its encoding
+ENCODING_SAMPLE_SIZE = 32768
+
+# Maximum total size in bytes of a parse cache directory. Least recently used
+# entries are evicted beyond it
+CACHE_SIZE_LIMIT = 2 * 1024 ** 3
+
+# Environment variable naming the parse cache directory used by the script
+CACHE_DIR_VARIABLE = 'GDUTILS_CACHE_DIR'
+
+# Order in which zip archive members are chosen for reading, by extension
+ZIP_MEMBER_PRIORITY = ['.geoparquet', '.parquet', '.feather', '.arrow', 
+                       '.shp', '.gpkg', '.geojson', '.json', '.csv', '.xlsx',
+                       '.pkl', '.bz2', '.gzip', '.xz', '.html', '.zip']
+
+# Output formats written incrementally, one chunk at a time, by extension
+STREAM_FORMATS = {'.csv': 'csv', '.tsv': 'tsv', '.ndjson': 'ndjson', 
+                  '.jsonl': 'ndjson', '.geojsonl': 'geojsonseq', 
+                  '.geojsons': 'geojsonseq'}
+
+# Number of rows of an in-memory table written to a stream at a time
+STREAM_CHUNKSIZE = 10000
+
+# Label of column holding the input file of each row, if reading many files
+SOURCE_COLUMN = 'source_file'
+
+# Spatial predicates of rows against query geometries, mapped to the 
+# predicate of query geometries against rows in a spatial index query
+SPATIAL_PREDICATES = {'intersects': 'intersects', 'within': 'contains', 
+                      'contains': 'within', 'covers': 'covered_by', 
+                      'covered_by': 'covers', 'overlaps': 'overlaps', 
+                      'crosses': 'crosses', 'touches': 'touches'}
+
+# Capabilities of a reader engine: reading a file in chunks ('streaming'),
+# parsing only given columns ('projection'), skipping rows not matching a 
+# (column, value) filter ('pushdown') and skipping rows outside a bounding
+# box ('bbox')
+ENGINE_CAPABILITIES = ['streaming', 'projection', 'pushdown', 'bbox']
+
+# Reader/writer engine: the extensions of files it handles (None for any),
+# its capabilities, and its read and write functions (see register_engine)
+Engine = collections.namedtuple(
+            'Engine', ['extensions', 'capabilities', 'read', 'write'])
+
+# Engines implemented by ExtractTable itself, which have no functions
+BUILTIN_ENGINES = ['pandas', 'pyarrow', 'fiona']
+
+# Registered engines by name, in order of preference for each extension. An
+# engine for any extension is used only if no other handles the extension
+ENGINES = {'pandas': Engine(['.csv', '.pkl', '.bz2', '.zip', '.gzip', '.xz', 
+                             '.xlsx', '.html', '.json'], 
+                            ['streaming', 'projection', 'pushdown'], 
+                            None, None)}
+if pyarrow is not None:
+    ENGINES['pyarrow'] = Engine(['.parquet', '.geoparquet', '.feather', 
+                                 '.arrow', '.csv'],
+                                ['streaming', 'projection'], None, None)
+ENGINES['fiona'] = Engine(None, ['streaming', 'projection', 'pushdown', 
+                                 'bbox'], None, None)
+
 
 
 #########################################
@@ -81,14 +175,33 @@ class ExtractTable:
     
     Attributes
     ----------
-    infile : str, optional, default = ``None``
-        Name/path of input file of tabular data to read.
+    infile : str | List[str], optional, default = ``None``
+        Name/path, list of names/paths or glob pattern of input file(s) of
+        tabular data to read.
     outfile : pathlib.Path, optional, default = ``None``
         Path of output file for writing.
     column : str, optional, default = ``None``
         Label of column to use as index for extracted table.
     value : str | List[str], optional, default = ``None``
         Value(s) of specified column in rows to extract.
+    chunksize : int, optional, default = ``None``
+        Number of rows to read at a time. If specified, the input file is
+        streamed in chunks rather than read into memory at once.
+    columns : List[str], optional, default = ``None``
+        Labels of columns to read from the input file. Defaults to all.
+    encoding : str, optional, default = ``None``
+        Text encoding of the input file. Defaults to detecting it.
+    cache_dir : pathlib.Path, optional, default = ``None``
+        Directory of cached parsed tables. Defaults to no caching.
+    lazy : bool, optional, default = ``False``
+        Whether reading the input file is deferred until data is needed.
+    bbox : Tuple[float, float, float, float], optional, default = ``None``
+        Bounding box (minx, miny, maxx, maxy) of rows to read.
+    mask : gpd.GeoSeries, optional, default = ``None``
+        Geometry of rows to read.
+    crs : pyproj.CRS, optional, default = ``None``
+        Coordinate reference system of extracted geometry. Defaults to the
+        input's.
     
     """
 
@@ -102,22 +215,83 @@ class ExtractTable:
                                            pd.DataFrame]] = None, 
                  outfile:   Optional[str] = None, 
                  column:    Optional[str] = None, 
-                 value:     Optional[Union[str, List[str]]] = None):
+                 value:     Optional[Union[str, List[str]]] = None,
+                 chunksize: Optional[int] = None,
+                 columns:   Optional[List[str]] = None,
+                 encoding:  Optional[str] = None,
+                 cache_dir: Optional[str] = None,
+                 lazy:      bool = False,
+                 bbox:      Optional[Tuple[float, float, float, float]] = None,
+                 mask:      Optional[Union[gpd.GeoDataFrame, gpd.GeoSeries, 
+                                           shapely.geometry.base.BaseGeometry]
+                                     ] = None,
+                 crs:       Optional[Union[str, int, pyproj.CRS]] = None,
+                 engine:    Optional[str] = None):
         """
         ExtractTable initializer. Returns an ExtractTable instance.
 
         Parameters
         ----------
-        infile : str | gpd.GeoDataFrame | pd.DataFrame \
+        infile : str | List[str] | gpd.GeoDataFrame | pd.DataFrame \
                      | None, optional, default = ``None``
             Name/path of input file of tabular data to read or geopandas
-            GeoDataFrame or pandas DataFrame.
+            GeoDataFrame or pandas DataFrame. Given a list of names/paths or
+            a glob pattern, the files are read concurrently, each with the
+            `columns` and `value` filter applied, and concatenated with a
+            'source_file' column naming the file of each row.
         outfile : str | None, optional, default = ``None``
             Name/path of output file for writing.
         column : str | None, optional, default = None
             Label of column to use as index for extracted table
         value : str | List[str] | None, optional, default = ``None``
-            Value(s) of specified column in rows to extract.
+            Value(s) of specified column in rows to extract. If given with
+            `column`, rows not containing the value(s) are skipped while 
+            `infile` is read. The file is re-read in full only if a later
+            column or value requires the skipped rows.
+        chunksize : int | None, optional, default = ``None``
+            Number of rows to read at a time. If specified and `infile` is
+            a path, the file is streamed in chunks of `chunksize` rows 
+            instead of being read into memory at once.
+        columns : List[str] | None, optional, default = ``None``
+            Labels of columns to read from `infile`. Other columns are never
+            parsed. The geometry column and `column` are always read.
+        encoding : str | None, optional, default = ``None``
+            Text encoding of `infile`. If None, the encoding of text files
+            is detected from a sample of their bytes before parsing.
+        cache_dir : str | None, optional, default = ``None``
+            Directory in which to cache parsed tables. If specified, a file
+            read with the same options is parsed once and later loaded from
+            the cache until the file's size or modification time changes.
+        lazy : bool, optional, default = ``False``
+            If True and `infile` is a path, the file is not read until data
+            is first needed, e.g. by ``extract`` or ``extract_to_file``. 
+            The `columns`, `column` and `value` set by then are applied while
+            the file is read, so only the selected rows and columns are 
+            parsed and geometrized. Errors reading the file or finding the 
+            column or value are raised at that point.
+        bbox : Tuple[float, float, float, float] | None, optional, \
+                   default = ``None``
+            Bounding box (minx, miny, maxx, maxy), in the CRS of `infile`,
+            of rows to read. Only rows whose geometry intersects it are read.
+            OGR formats (e.g. .shp, .gpkg) skip other features while being
+            read; other inputs are filtered with a spatial index once their
+            geometry is decoded. Ignored for tables without geometry.
+        mask : gpd.GeoDataFrame | gpd.GeoSeries | shapely.geometry \
+                   | None, optional, default = ``None``
+            Geometry of rows to read. Only rows whose geometry intersects it
+            are read, as with `bbox`. A GeoDataFrame or GeoSeries with a CRS
+            is reprojected to the CRS of `infile`.
+        crs : str | int | pyproj.CRS | None, optional, default = ``None``
+            Coordinate reference system to reproject geometry to, e.g. 
+            'EPSG:4326'. The table is reprojected once as it is read (or 
+            each chunk, if streamed), and not at all if already in `crs`.
+        engine : str | None, optional, default = ``None``
+            Name of the engine with which to read and write files, e.g. 
+            'pyarrow' (see ``list_engines``). If None, or for formats the 
+            engine doesn't handle, the preferred engine for each format is
+            used. Built-in engines only choose how files are read; files 
+            are written as their format dictates unless by a registered
+            engine.
         
         Returns
         -------
@@ -158,20 +332,69 @@ class ExtractTable:
         >>> et8 = extract.ExtractTable(pd.DataFrame())
         # initializes the input data source as a pandas DataFrame
 
+        >>> et9 = extract.ExtractTable('in.csv', 'out.csv', 'ID', '01',
+        ...                            chunksize=100000)
+        # streams the input file 100000 rows at a time
+
+        >>> et10 = extract.ExtractTable('in.csv', columns=['ID', 'NAME'])
+        # reads only columns 'ID' and 'NAME' from the input file
+
+        >>> et11 = extract.ExtractTable('in.csv', encoding='cp1252')
+        # reads the input file as Windows-1252 instead of detecting it
+
+        >>> et12 = extract.ExtractTable('in.shp', cache_dir='~/.cache/gdutils')
+        # parses 'in.shp' once; later reads load the parsed table from cache
+
+        >>> et13 = extract.ExtractTable('in.shp', lazy=True)
+        >>> et13.column = 'ID'
+        >>> et13.value = '01'
+        >>> gdf = et13.extract()
+        # reads only the rows of 'in.shp' whose 'ID' is '01', on extract
+
+        >>> et14 = extract.ExtractTable('states/*.shp', column='GEOID')
+        # reads all shapefiles in 'states' into one table
+
+        >>> et15 = extract.ExtractTable('blocks.shp', mask=county_gdf)
+        # reads only the blocks that intersect the county's geometry
+
+        >>> et16 = extract.ExtractTable('in.shp', crs='EPSG:4326')
+        # reprojects the geometry of 'in.shp' to WGS 84
+
         """
         # Encapsulated attributes
         self.__infile =     None
         self.__outfile =    None
         self.__column =     None
         self.__value =      None
+        self.__chunksize =  None
+        self.__columns =    None
+        self.__encoding =   None
+        self.__cache_dir =  None
+        self.__lazy =       False
+        self.__bbox =       None
+        self.__mask =       None
+        self.__crs =        None
+        self.__engine =     None
 
         # Protected attributes
         self.__table =      None
-        self.__coldata =    None
         self.__foundval =   False
         self.__extracted =  None
-
-        self.__sanitize_init(infile, outfile, column, value)
+        self.__result =     None
+        self.__flat =       None
+        self.__schema =     None
+        self.__spatial =    False
+        self.__rows =       None
+        self.__predicate =  None
+        self.__encodings =  {}
+        self.__dtypes =     {}
+        self.__positions =  None
+        self.__pending =    False
+        self.__compacted =  None
+
+        self.__sanitize_init(infile, outfile, column, value, chunksize, 
+                             columns, encoding, cache_dir, lazy, bbox, mask, 
+                             crs, engine)
     
 
     def __sanitize_init(self,
@@ -180,7 +403,17 @@ class ExtractTable:
                                              pd.DataFrame]], 
                         outfile:    Optional[str], 
                         column:     Optional[str], 
-                        value:      Optional[Union[str, List[str]]]):
+                        value:      Optional[Union[str, List[str]]],
+                        chunksize:  Optional[int],
+                        columns:    Optional[List[str]],
+                        encoding:   Optional[str],
+                        cache_dir:  Optional[str],
+                        lazy:       bool,
+                        bbox:       Optional[Tuple[float, float, 
+                                                   float, float]],
+                        mask:       Optional[gpd.GeoSeries],
+                        crs:        Optional[Union[str, int, pyproj.CRS]],
+                        engine:     Optional[str]):
         """
         Safely initializes attributes using setters.
 
@@ -195,6 +428,24 @@ class ExtractTable:
             Label of column to use as index for extracted table.
         value: str | List[str] | None, optional
             Value(s) of specified column in rows to extract.
+        chunksize: int | None, optional
+            Number of rows to read at a time.
+        columns: List[str] | None, optional
+            Labels of columns to read from the input file.
+        encoding: str | None, optional
+            Text encoding of the input file.
+        cache_dir: str | None, optional
+            Directory in which to cache parsed tables.
+        lazy: bool
+            Whether reading the input file is deferred until data is needed.
+        bbox: Tuple[float, float, float, float] | None, optional
+            Bounding box of rows to read.
+        mask: gpd.GeoSeries | None, optional
+            Geometry of rows to read.
+        crs: str | int | pyproj.CRS | None, optional
+            Coordinate reference system to reproject geometry to.
+        engine: str | None, optional
+            Name of the engine with which to read and write files.
         
         Raises
         ------
@@ -203,6 +454,21 @@ class ExtractTable:
 
         """
         try:
+            self.__lazy = bool(lazy)
+            self.chunksize = chunksize
+            self.encoding = encoding
+            self.cache_dir = cache_dir
+            self.engine = engine
+            self.bbox = bbox
+            self.mask = mask
+            self.crs = crs
+            if columns is not None and column is not None and \
+               column not in columns:
+                columns = list(columns) + [column]
+            self.columns = columns
+            if column is not None and value is not None and \
+               chunksize is None and self.__is_path(infile):
+                self.__predicate = (column, value) # pushed down into read
             self.infile = infile
             self.outfile = outfile
             self.column = column
@@ -216,10 +482,21 @@ class ExtractTable:
     # Public Instance Methods                   |
     #===========================================+
 
-    def extract(self) -> gpd.GeoDataFrame:
+    def extract(self, copy: bool = True) -> gpd.GeoDataFrame:
         """
         Returns a GeoPandas GeoDataFrame containing extracted subtable.
 
+        With a column set, the extracted table is built once and reused by
+        later calls until the column, value or source table changes.
+
+        Parameters
+        ----------
+        copy : bool, optional, default = ``True``
+            If False, returns the reused extracted table itself rather than
+            a copy of it, which must then not be modified. Has no effect if 
+            no column is set, as the source table itself is returned, or if
+            the table is streamed, as a new table is read on every call.
+
         Returns
         -------
         gpd.GeoDataFrame
@@ -263,22 +540,36 @@ class ExtractTable:
         c          lkjh    3     None
 
         """
-        if self.__table is None:
+        self.__materialize()
+        if self.__is_streamed():
+            chunks = list(self.iter_chunks())
+            if chunks:
+                return pd.concat(chunks)
+
+            df = pd.DataFrame(columns=self.__schema)
+            return self.__as_geodataframe(
+                        df.set_index(self.column) if self.column else df)
+        elif self.__table is None:
             raise RuntimeError("Unable to find tabular data to extract")
         elif self.column:
-            return self.__reindex()
+            gdf = self.__as_geodataframe(self.__reindex())
+            return gdf.copy() if copy else gdf
         else:
-            return self.__table
+            return self.__as_geodataframe(self.__get_table(None, None))
             
 
     def extract_to_file(self, outfile: Optional[str] = None,
-                        driver: Optional[str] = None
+                        driver: Optional[str] = None,
+                        fmt: Optional[str] = None,
+                        crs: Optional[Union[str, int, pyproj.CRS]] = None
                         ) -> NoReturn:
         """
         Writes the tabular extracted data to a file. 
         
         Given an optional Fiona support OGR driver, writes to file using the 
-        driver. If outfile is None, data is printed as plaintext to stdout.
+        driver. If outfile is None, data is printed as plaintext to stdout,
+        or, given a `fmt`, streamed to stdout in that format as rows are
+        read.
 
         Parameters
         ----------
@@ -286,11 +577,19 @@ class ExtractTable:
             Name of file to write extracted data.
         driver: str | None, optional, default = ``None``
             Name of Fiona supported OGR drivers to use for file writing.
+        fmt: str | None, optional, default = ``None``
+            Format of data written to stdout: 'csv', 'tsv', 'ndjson' or 
+            'geojsonseq'. If None, writes an aligned plaintext table.
+        crs: str | int | pyproj.CRS | None, optional, default = ``None``
+            Coordinate reference system of written geometry. If None, uses
+            the initialized `crs`.
         
         Raises
         ------
         RuntimeError
             Raised if unable to extract to output file.
+        ValueError
+            Raised if `fmt` is not a supported format.
 
         See Also
         --------
@@ -316,48 +615,245 @@ class ExtractTable:
         >>> et2.extract_to_file('ESRI Shapefile')
         # extracts table to 'output' in specified format of 'ESRI Shapefile'
 
-        """
-        gdf = self.extract()
-        is_geometric = self.__has_spatial_data(gdf)
+        >>> et3 = extract.ExtractTable('big.csv', chunksize=100000)
+        >>> et3.extract_to_file(fmt='ndjson')
+        # streams the table to standard output as newline-delimited JSON
 
+        """
         if outfile is None:
             filename = self.outfile
         else:
             filename = outfile
 
+        if fmt is not None and fmt not in STREAM_FORMATS.values():
+            raise ValueError("Unsupported format: {}".format(fmt))
+
+        self.__materialize()
+        if filename is None and fmt is not None:
+            chunksize = self.chunksize or STREAM_CHUNKSIZE
+            if self.__is_streamed():
+                chunks = self.__iter_streamed(chunksize)
+                is_geometric = 'geometry' in self.__schema
+            else: # slices of the extraction, left undecoded and uncopied
+                gdf = self.__extract_table()
+                is_geometric = self.__has_spatial_data(gdf)
+                chunks = (gdf.iloc[i:i + chunksize] 
+                          for i in range(0, len(gdf), chunksize))
+            chunks = map(lambda gdf: self.__reproject(gdf, crs), chunks)
+            self.__write_stream(chunks, sys.stdout, fmt, is_geometric)
+            return
+
+        if self.__is_streamed():
+            try:
+                self.__extract_chunks_to_file(filename, driver, crs)
+            except Exception as e:
+                raise RuntimeError("Extraction failed:", e)
+            return
+
+        gdf = self.__reproject(self.__extract_table(), crs)
+        is_geometric = self.__has_spatial_data(gdf)
+
         if filename is None:
-            if is_geometric:
-                gdf.to_string(buf=sys.stdout)
-            else:
-                pd.DataFrame(gdf).drop(
-                        columns='geometry').to_string(buf=sys.stdout)
+            self.__drop_empty_geometry(gdf, is_geometric).to_string(
+                    buf=sys.stdout)
 
         else:
-            ext = self.__get_extension(filename)
             try: 
-                if is_geometric and ext == '.shp':
-                    gdf.to_file(filename)
-                elif is_geometric and ext == '.geojson':
-                    gdf.to_file(filename, driver='GeoJSON')
-                elif is_geometric and ext == '.gpkg':
-                    gdf.to_file(filename, driver='GPKG')
-                elif is_geometric and driver is not None:
-                    gdf.to_file(filename, driver=driver)
-                elif is_geometric:
-                    self.__extract_to_inferred_file(
-                            pd.DataFrame(gdf), filename, ext)
-                else:
-                    self.__extract_to_inferred_file(
-                            pd.DataFrame(gdf).drop(columns='geometry'), 
-                            filename, ext)
+                self.__write_file(gdf, filename, driver, is_geometric)
             except Exception as e:
                 try:
                     os.makedirs(self.__outfile.parent)
-                    self.extract_to_file(outfile, driver)
+                    self.extract_to_file(outfile, driver, fmt, crs)
                 except:
                     raise RuntimeError("Extraction failed:", e)
 
 
+    def iter_chunks(self, 
+                    chunksize: Optional[int] = None
+                    ) -> Iterator[gpd.GeoDataFrame]:
+        """
+        Returns an iterator of GeoDataFrames containing the extracted 
+        subtable in chunks of at most `chunksize` rows. 
+        
+        If the ExtractTable was initialized with a `chunksize`, the input
+        file is read, geometrized, filtered and reindexed one chunk at a 
+        time, so that at most one chunk is held in memory.
+
+        Parameters
+        ----------
+        chunksize : int | None, optional, default = ``None``
+            Maximum number of rows per chunk. If None, uses the initialized
+            `chunksize`. If neither is specified, yields a single chunk.
+
+        Returns
+        -------
+        Iterator[gpd.GeoDataFrame]
+            An iterator of geopandas GeoDataFrames of the extracted table.
+
+        Raises
+        ------
+        RuntimeError
+            Raised if trying to extract from non-existent tabular data.
+        KeyError
+            Raised if a streamed input has no rows containing `value`.
+
+        See Also
+        --------
+        extract.ExtractTable.extract
+
+        Examples
+        --------
+        >>> et = extract.ExtractTable('national.csv', column='STATEFP', 
+        ...                           value='25', chunksize=100000)
+        >>> for chunk in et.iter_chunks():
+        ...     print(len(chunk))
+        # reads 'national.csv' 100000 rows at a time and prints the
+        # number of rows in each chunk containing 'STATEFP' value '25'
+
+        """
+        if chunksize is None:
+            chunksize = self.chunksize
+
+        self.__materialize()
+        if not self.__is_streamed():
+            gdf = self.extract()
+            if chunksize is None:
+                yield gdf
+            else:
+                for i in range(0, len(gdf), chunksize):
+                    yield gdf.iloc[i:i + chunksize]
+            return
+
+        for gdf in self.__iter_streamed(chunksize):
+            if isinstance(gdf, gpd.GeoDataFrame):
+                yield gdf
+            else:
+                yield self.__geometrize_gdf(gdf)
+
+
+    def __iter_streamed(self, 
+                        chunksize: Optional[int]
+                        ) -> Iterator[Union[gpd.GeoDataFrame, pd.DataFrame]]:
+        """
+        Returns an iterator of the extracted chunks of a streamed input. 
+        Chunks of CSVs without geometry or with geometry held as WKT are 
+        DataFrames, as tables read whole are.
+
+        """
+        found = False
+        if self.value is not None:
+            predicate = (self.column, self.value)
+        else:
+            predicate = None
+
+        for gdf in self.__read_chunks(self.infile, chunksize, predicate):
+            if gdf.empty:
+                continue
+
+            found = True
+            gdf = self.__reproject(gdf)
+            if self.column:
+                yield self.__index(gdf)
+            else:
+                yield gdf
+
+        if predicate is not None and not found:
+            raise KeyError("Column '{}' has no value '{}'".format(
+                                self.column, self.value))
+
+
+    def extract_where(self, 
+                      geometry: Union[shapely.geometry.base.BaseGeometry,
+                                      List[shapely.geometry.base.BaseGeometry],
+                                      gpd.GeoSeries, gpd.GeoDataFrame],
+                      predicate: Optional[str] = 'intersects'
+                      ) -> gpd.GeoDataFrame:
+        """
+        Returns a GeoPandas GeoDataFrame containing the rows of the 
+        extracted subtable whose geometry satisfies a spatial predicate 
+        against any of the given geometries.
+
+        Candidate rows are found in the table's spatial index, an STRtree
+        built on first use and reused by later queries, so only rows near a
+        query geometry are tested. Streamed tables are instead tested chunk
+        by chunk against an index of the query geometries.
+
+        Parameters
+        ----------
+        geometry : shapely.geometry | List[shapely.geometry] \
+                       | gpd.GeoSeries | gpd.GeoDataFrame
+            Query geometry or geometries. A GeoSeries or GeoDataFrame with a
+            CRS is reprojected to the table's CRS.
+        predicate : str, optional, default = ``'intersects'``
+            Relation of each returned row's geometry to a query geometry: 
+            'intersects', 'within', 'contains', 'covers', 'covered_by', 
+            'overlaps', 'crosses' or 'touches'.
+
+        Returns
+        -------
+        gpd.GeoDataFrame
+            A geopandas GeoDataFrame of the matching rows.
+
+        Raises
+        ------
+        RuntimeError
+            Raised if trying to extract from non-existent tabular data.
+        ValueError
+            Raised if the table has no geometry or `predicate` is not 
+            supported.
+
+        See Also
+        --------
+        extract.ExtractTable.extract
+
+        Examples
+        --------
+        >>> et = extract.read_file('precincts.shp', 'PRECINCT')
+        >>> plan = gpd.read_file('districts.shp')
+        >>> gdf = et.extract_where(plan[plan['DISTRICT'] == 4], 'within')
+        # extracts the precincts within district 4
+
+        """
+        if predicate not in SPATIAL_PREDICATES:
+            raise ValueError("Unsupported predicate: {}".format(predicate))
+
+        self.__materialize()
+        if self.__is_streamed():
+            if not self.__spatial:
+                raise ValueError("Unable to find geometry to query")
+            query = None
+            found = []
+            for gdf in self.iter_chunks():
+                if query is None:
+                    query = self.__query_geometry(geometry, gdf.crs)
+                rows = np.unique(gdf.sindex.query(
+                                    query, 
+                                    predicate=SPATIAL_PREDICATES[predicate])[1])
+                found.append(gdf.take(rows))
+            if found:
+                return pd.concat(found)
+            else:
+                return gpd.GeoDataFrame(columns=self.__schema)
+
+        elif self.__table is None:
+            raise RuntimeError("Unable to find tabular data to extract")
+
+        table = self.__get_decoded_table(self.column, self.value)
+        if not self.__has_spatial_data(table):
+            raise ValueError("Unable to find geometry to query")
+
+        rows = np.unique(table.sindex.query(
+                            self.__query_geometry(geometry, table.crs), 
+                            predicate=SPATIAL_PREDICATES[predicate])[1])
+        if self.value is not None:
+            rows = np.intersect1d(rows, self.__lookup(table, self.value))
+
+        if self.column:
+            return self.__index(table, rows)
+        else:
+            return table.take(rows)
+
+
     def list_columns(self) -> np.ndarray:
         """
         Returns a list of all columns in the initialized source tabular data.
@@ -385,9 +881,16 @@ class ExtractTable:
         ['Unnamed: 0' 'col1' 'col2']
 
         """
-        if self.__table is None:
+        self.__materialize()
+        if self.__is_streamed():
+            columns = np.array(self.__schema, dtype=object)
+            if self.__spatial:
+                return columns
+            else:
+                return columns[columns != 'geometry']
+        elif self.__table is None:
             raise RuntimeError("Unable to find tabular data to extract")
-        elif self.__has_spatial_data(self.__table):
+        elif self.__spatial:
             return self.__table.columns.values
         else:
             try:
@@ -454,210 +957,1987 @@ class ExtractTable:
         ['a' 'c' 'b']
 
         """
-        if self.__table is None:
+        self.__materialize()
+        if self.__is_streamed():
+            return self.__list_streamed_values(
+                        column if column is not None else self.column, unique)
+
+        elif self.__table is None:
             raise RuntimeError("Unable to find tabular data to extract")
 
         elif column is not None: 
             try:
+                table = self.__get_decoded_table(None, None) \
+                            if column == 'geometry' \
+                            else self.__get_table(None, None)
                 if unique:
-                    return self.__table[column].unique()
+                    return table[column].unique()
                 else:
-                    return self.__table[column].values
+                    return table[column].values
             except:
                 raise KeyError("Unable to find column '{}'".format(column))
 
         elif column is None and self.column is not None:
-            if unique:
-                return self.__table[self.column].unique()
+            table = self.__get_table(None, None)
+            uniques = self.__get_uniques(table) if unique else None
+            if uniques is not None:
+                return uniques.copy()
+            elif unique:
+                return table[self.column].unique()
             else:
-                return self.__table[self.column].values
+                return table[self.column].values
 
         else:
             raise RuntimeError("No initialized column exists")
             
 
-    #===========================================+
-    # Private Helper Methods                    |
-    #===========================================+
+    def partition_by(self, 
+                     column: str, 
+                     out_template: str,
+                     driver: Optional[str] = None
+                     ) -> dict:
+        """
+        Writes the extracted table to one file per value of the given 
+        column, in a single pass.
 
-    def __reindex(self) -> gpd.GeoDataFrame:
-        if self.value is not None:
-            return self.__geometrize_gdf(gpd.GeoDataFrame(
-                        self.__extracted.set_index(self.column)))
-        else:
-            return self.__geometrize_gdf(gpd.GeoDataFrame(
-                        self.__table.set_index(self.column)))
+        The table is grouped by `column` once and each group is written to
+        the file named by formatting `out_template` with its value. If the
+        ExtractTable was initialized with a `chunksize`, the input file is
+        streamed once and each chunk's groups are appended to their files.
+        Rows missing a value in `column` are skipped.
 
+        Parameters
+        ----------
+        column : str
+            Label of column whose values partition the table. May be the
+            initialized column.
+        out_template : str
+            Name/path of output files, containing ``{}`` where each value
+            is substituted, e.g. ``'states/{}.shp'``.
+        driver : str | None, optional, default = ``None``
+            Name of Fiona supported OGR drivers to use for file writing.
 
-    def __get_extension(self, filename: str) -> str:
-        (_, extension) = os.path.splitext(filename)
-        return extension.lower()
+        Returns
+        -------
+        dict
+            A dict mapping each value of `column` to the pathlib.Path of the
+            file its rows were written to.
+
+        Raises
+        ------
+        RuntimeError
+            Raised if trying to extract from non-existent tabular data.
+        ValueError
+            Raised if `out_template` does not vary with the value.
+        KeyError
+            Raised if column does not exist in tabular data.
 
+        See Also
+        --------
+        extract.ExtractTable.extract_to_file
 
-    def __read_file(self, filename: str) -> Tuple[str, gpd.GeoDataFrame]:
-        """
-        Given a filename, returns a tuple of a tabular file's name and 
-        a GeoDataFrame containing tabular data.
+        Examples
+        --------
+        >>> et = extract.read_file('national.shp', 'GEOID')
+        >>> paths = et.partition_by('STATEFP', 'states/{}.shp')
+        # writes 'states/01.shp', 'states/02.shp', ... indexed by 'GEOID'
 
         """
-        ext = self.__get_extension(filename)
-
-        if ext != '.zip':
-            try: # gpd has df init problems. Fix: try converting a pd read
-                return (filename, self.__geometrize_gdf(
-                                        gpd.GeoDataFrame(self.__read_inferred(
-                                                            filename, ext))))
-            except:
-                return (filename, self.__geometrize_gdf(
-                                        gpd.read_file(filename)))
+        out_template = str(out_template)
+        if out_template.format('a') == out_template.format('b'):
+            raise ValueError(
+                "Template '{}' must contain '{{}}'".format(out_template))
+
+        self.__materialize()
+        if self.__is_streamed():
+            if column not in self.__schema:
+                raise KeyError("Column not found: {}".format(column))
+            chunks = self.__iter_streamed(self.chunksize)
+        elif self.__table is None:
+            raise RuntimeError("Unable to find tabular data to extract")
         else:
-            return self.__read_zip(filename)
-
+            chunks = iter([self.__extract_table()])
+
+        paths = {}
+        pending = {} # partitions of files that can't be appended to
+        is_geometric = None
+        for gdf in chunks:
+            if is_geometric is None:
+                is_geometric = self.__has_spatial_data(gdf)
+
+            groups = gdf.groupby(column, sort=False).indices
+            for (value, rows) in groups.items():
+                part = gdf.take(rows) if len(rows) < len(gdf) else gdf
+                if value not in paths:
+                    paths[value] = pathlib.Path(out_template.format(value))
+                    mode = 'w'
+                    if not paths[value].parent.exists():
+                        os.makedirs(paths[value].parent)
+                else:
+                    mode = 'a'
 
-    def __read_zip(self, filename: str) -> Tuple[str, gpd.GeoDataFrame]:
-        """
-        Helper to self.__read_file. Recursively unzips given zipfiles.
-        Unlike gpd, can handle relative paths and doesn't require
-        'zip:///' prepend.
+                if self.__is_appendable(paths[value], driver, is_geometric):
+                    self.__append_file(part, paths[value], driver, 
+                                       is_geometric, mode)
+                else:
+                    pending.setdefault(value, []).append(part)
 
-        """
-        (name, gdf) = (None, None)
+        for (value, parts) in pending.items():
+            self.__write_file(parts[0] if len(parts) == 1 else pd.concat(parts),
+                              paths[value], driver, is_geometric)
 
-        for file in self.__unzip(filename):
-            try:
-                (name, gdf) = self.__read_file(file)
-                break
-            except:
-                continue
+        return paths
 
-        if gdf is None:
-            raise FileNotFoundError("No file found".format(name))
-        else:
-            return (name, gdf)
-        
 
-    def __unzip(self, filename: str) -> List[str]:
+    def apply_by(self, 
+                 column: str, 
+                 func: Callable[[gpd.GeoDataFrame], Any],
+                 workers: Optional[int] = None
+                 ) -> dict:
         """
-        Given a zipfile filename, returns a list of filenames in the 
-        unzipped directory.
+        Calls a function on the subtable of each value of the given column,
+        in a pool of worker processes, and returns the results.
 
-        """
-        cwd = os.path.splitext(filename)[0]
-        with zipfile.ZipFile(filename, 'r') as zipped:
-            zipped.extractall(cwd)
-            
-        if os.path.isdir(cwd) is None:
-            raise IOError("Directory \'{}\' not found.".format(cwd))
-        else:
-            (_, _, files) = next(os.walk(cwd))
-            return [os.path.join(cwd, file) for file in files]
+        The extracted table is grouped by `column` once. Each worker is sent
+        only the rows of the group it is given, not the whole table, and at
+        most two groups per worker are waiting to be sent at a time.
 
+        Parameters
+        ----------
+        column : str
+            Label of column whose values group the table. May be the 
+            initialized column.
+        func : Callable[[gpd.GeoDataFrame], Any]
+            Function to call on each group's GeoDataFrame. Must be picklable,
+            e.g. defined at the top level of a module, if `workers` > 1.
+        workers : int | None, optional, default = ``None``
+            Number of worker processes. If None, uses the number of CPUs. If
+            1, groups are processed one at a time in the current process.
 
-    def __has_spatial_data(self, gdf: gpd.GeoDataFrame) -> bool:
-        return not gdf['geometry'].isna().all()
+        Returns
+        -------
+        dict
+            A dict mapping each value of `column`, in order of first 
+            appearance, to the result of `func` on its rows.
 
+        Raises
+        ------
+        RuntimeError
+            Raised if trying to extract from non-existent tabular data.
+        KeyError
+            Raised if column does not exist in tabular data.
+        ValueError
+            Raised if `workers` is not a positive integer.
 
-    def __read_inferred(self, filename: str, ext: str) -> pd.DataFrame:
-        if ext == '.csv':
-            try:
-                return pd.read_csv(filename, low_memory=False) 
-            except:
-                return pd.read_csv(filename, encoding='ISO-8859-1', 
-                                   low_memory=False)
-        elif ext == '.pkl' or ext == '.bz2' or ext == '.zip' or \
-             ext == '.gzip' or ext == '.xz':
-            return pd.read_pickle(filename)
-        elif ext == '.xlsx':
-            return pd.read_excel(filename)
-        elif ext == '.html':
-            return pd.read_html(filename)
-        elif ext == '.json':
-            return pd.read_json(filename)
-        else:
-            raise FileNotFoundError('Cannot read {}'.format(filename))
+        See Also
+        --------
+        extract.ExtractTable.partition_by
 
+        Examples
+        --------
+        >>> def turnout(gdf):
+        ...     return gdf['VOTES'].sum() / gdf['VAP'].sum()
+        >>> et = extract.read_file('national.shp')
+        >>> rates = et.apply_by('STATEFP', turnout, workers=32)
+        # computes the turnout of each state in 32 processes
 
-    def __extract_to_inferred_file(
-            self, 
-            df: Union[gpd.GeoDataFrame, pd.DataFrame], 
-            filename: pathlib.Path, 
-            ext: str
-            ) -> NoReturn:
-        has_index = self.column is not None
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        elif int(workers) < 1:
+            raise ValueError("Workers must be a positive integer")
 
-        if ext == '.csv':
-            df.to_csv(path_or_buf=filename, index=has_index)
-        elif ext == '.pkl' or ext == '.bz2' or ext == '.zip' or \
-             ext == '.gzip' or ext == '.xz':
-            df.to_pickle(filename)
-        elif ext == '.xlsx':
-            df.to_excel(filename, index=has_index)
-        elif ext == '.html':
-            df.to_html(buf=filename, index_names=has_index)
-        elif ext == '.json':
-            df.to_json(path_or_buf=filename)
-        elif ext == '.tex':
-            df.to_latex(buf=filename, index=has_index)
-        else:
-            with open(filename, 'w') as out:
-                if ext == '.md':
-                    out.write(df.to_markdown())
-                else:
-                    out.write(df.to_string())
-    
+        table = self.extract(copy=False)
+        groups = table.groupby(column, sort=False).indices
 
-    def __geometrize_gdf(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
-        try:
-            geometry = gdf['geometry'].map(shapely.wkt.loads)
-            geometrized = gdf.drop(columns='geometry')
-            return gpd.GeoDataFrame(geometrized, geometry=geometry)
+        if int(workers) == 1:
+            return {value: func(table.take(rows)) 
+                    for (value, rows) in groups.items()}
 
-        except:
-            if 'geometry' not in gdf.columns:
-                return gpd.GeoDataFrame(gdf, geometry=gpd.GeoSeries())
-            else:
-                return gdf
+        results = {}
+        with concurrent.futures.ProcessPoolExecutor(int(workers)) as executor:
+            pending = collections.deque()
+            for (value, rows) in groups.items():
+                if len(pending) >= 2 * int(workers):
+                    (done, future) = pending.popleft()
+                    results[done] = future.result()
+                pending.append(
+                        (value, executor.submit(func, table.take(rows))))
 
+            for (done, future) in pending:
+                results[done] = future.result()
 
-    #===========================================+
-    # Getters and Setters                       |
-    #===========================================+
+        return results
 
-    @property
-    def infile(self) -> str:
-        """
-        {str} 
-            Name/path of input file of tabular data to read
-        
+
+    def optimize(self, 
+                 max_unique_ratio: Optional[float] = 0.5
+                 ) -> Tuple[int, int]:
         """
-        return self.__infile
+        Reduces the memory used by the source table, and returns its memory
+        usage in bytes before and after.
 
-    @infile.setter
-    def infile(self, 
-               infile: Optional[Union[str, 
-                                      gpd.GeoDataFrame,
-                                      pd.DataFrame]]) -> NoReturn:
-        if infile is not None and self.__infile is not None:
-            raise Exception("Infile '{}' is already set".format(self.__infile))
-        elif infile is not None:
-            try:
-                (self.__infile, self.__table) = self.__read_file(infile)
-            except:
-                try:
-                    self.__infile = None
-                    self.__table = self.__geometrize_gdf(
-                                        gpd.GeoDataFrame(infile))
+        Integer columns are downcast to the smallest signed integer type 
+        holding their values, and float columns to float32 if no precision
+        is lost. String columns with few distinct values, e.g. FIPS codes 
+        or party labels, are converted to categoricals. Columns are only
+        converted if that uses less memory. The table is compacted again if
+        it is later re-read.
 
-                except Exception as e:
-                    raise FileNotFoundError(
-                            "{} not found. {}".format(infile, e))
+        Parameters
+        ----------
+        max_unique_ratio : float, optional, default = ``0.5``
+            Maximum ratio of distinct values to rows of a string column for
+            it to be converted to a categorical.
 
+        Returns
+        -------
+        Tuple[int, int]
+            The table's ``memory_usage(deep=True)`` total in bytes before and
+            after compaction.
 
-    @property
-    def outfile(self) -> Optional[pathlib.Path]:
-        """
-        {pathlib.Path | None}
-            Path of output file for writing. Defaults to stdout
+        Raises
+        ------
+        RuntimeError
+            Raised if trying to optimize non-existent or streamed tabular 
+            data.
+
+        Examples
+        --------
+        >>> et = extract.read_file('precincts.csv', 'COUNTYFP')
+        >>> (before, after) = et.optimize()
+        >>> print(before, after)
+        52428800 9437184
+
+        """
+        self.__materialize()
+        if self.__is_streamed():
+            raise RuntimeError("Unable to optimize streamed tabular data")
+        elif self.__table is None:
+            raise RuntimeError("Unable to find tabular data to optimize")
+
+        before = int(self.__table.memory_usage(deep=True).sum())
+        self.__compacted = max_unique_ratio
+        self.__set_table(self.__compact(self.__table, max_unique_ratio))
+        self.__extracted = None
+
+        return (before, int(self.__table.memory_usage(deep=True).sum()))
+
+
+    #===========================================+
+    # Private Helper Methods                    |
+    #===========================================+
+
+    def __materialize(self) -> NoReturn:
+        """
+        Executes the operations recorded by a lazy ExtractTable. The input
+        file is read once, with the recorded column and value pushed down
+        into the read, then the column is indexed and the value looked up
+        in the rows read. Does nothing if the file is already read.
+
+        """
+        if not self.__pending:
+            return
+
+        (infile, column, value) = (self.__infile, self.__column, self.__value)
+        columns = self.__columns
+        (self.__infile, self.__column, self.__value) = (None, None, None)
+        self.__pending = False
+
+        if self.__columns is not None and column is not None and \
+           column not in self.__columns:
+            self.__columns = self.__columns + [column]
+        if column is not None and value is not None and \
+           self.chunksize is None:
+            self.__predicate = (column, value) # pushed down into read
+        else:
+            self.__predicate = None
+
+        self.__lazy = False # replays the setters eagerly
+        try:
+            self.infile = infile
+            self.column = column
+            self.value = value
+        except:
+            # Keep the recorded operations so the read can be retried
+            (self.__infile, self.__column, self.__value) = \
+                (infile, column, value)
+            (self.__columns, self.__predicate) = (columns, None)
+            self.__pending = True
+            raise
+        finally:
+            self.__lazy = True
+
+
+    def __extract_table(self) -> Union[gpd.GeoDataFrame, pd.DataFrame]:
+        """
+        Returns the in-memory extracted table, a DataFrame if the source 
+        table has no geometry or holds it undecoded.
+
+        """
+        if self.__table is None:
+            raise RuntimeError("Unable to find tabular data to extract")
+        elif self.column:
+            return self.__reindex()
+        else:
+            return self.__get_table(None, None)
+
+
+    def __as_geodataframe(self, 
+                          df: Union[gpd.GeoDataFrame, pd.DataFrame]
+                          ) -> gpd.GeoDataFrame:
+        """
+        Returns the table as a GeoDataFrame, decoding geometry held as WKT
+        or adding an empty geometry column to a table read without one. 
+        The GeoDataFrame built for the last such table is reused.
+
+        """
+        if isinstance(df, gpd.GeoDataFrame) and 'geometry' in df.columns:
+            return df
+        elif self.__flat is None or self.__flat[0] is not df:
+            self.__flat = (df, self.__geometrize_gdf(df))
+
+        return self.__flat[1]
+
+
+    def __reindex(self) -> gpd.GeoDataFrame:
+        """
+        Returns the extracted table indexed by the initialized column, 
+        reusing the last one built from the same table, column and value.
+        Setting the column or value discards it.
+
+        """
+        table = self.__get_table(self.column, self.value)
+        if self.__result is not None and self.__result[0] is table:
+            return self.__result[1]
+
+        if self.value is not None:
+            if self.__extracted is None or self.__extracted[0] is not table:
+                self.__extracted = (table, self.__lookup(table, self.value))
+            gdf = self.__index(table, self.__extracted[1])
+        else:
+            gdf = self.__index(table)
+
+        self.__result = (table, gdf)
+        return gdf
+
+
+    def __index(self, 
+                gdf: gpd.GeoDataFrame,
+                rows: Optional[np.ndarray] = None
+                ) -> gpd.GeoDataFrame:
+        """
+        Returns the rows of the table at the given positions (default all),
+        indexed by the initialized column. The rows are copied out of the 
+        table once and indexed in place.
+
+        """
+        if rows is None:
+            indexed = gdf.set_index(self.column)
+        else:
+            indexed = gdf.take(rows)
+            indexed.set_index(self.column, inplace=True)
+
+        if not isinstance(gdf, gpd.GeoDataFrame) or \
+           (isinstance(indexed, gpd.GeoDataFrame) and 
+            'geometry' in indexed.columns):
+            return indexed # tables read as DataFrames stay DataFrames
+        else:
+            return self.__geometrize_gdf(gpd.GeoDataFrame(indexed))
+
+
+    def __select(self, 
+                 gdf: gpd.GeoDataFrame, 
+                 column: str,
+                 value: Union[str, List[str]]
+                 ) -> gpd.GeoDataFrame:
+        return gdf[self.__matches(gdf[column], value)]
+
+
+    def __lookup(self, 
+                 table: gpd.GeoDataFrame, 
+                 value: Union[str, List[str]]
+                 ) -> np.ndarray:
+        """
+        Returns the positions of the rows of the table whose initialized 
+        column contains the value(s), looked up in the column's 
+        value-to-row-positions index once it is built and otherwise found 
+        by scanning the column. No rows are copied.
+
+        """
+        positions = self.__get_positions(table)
+        if positions is None:
+            return np.flatnonzero(self.__matches(table[self.column], value))
+
+        values = value if pd.api.types.is_list_like(value) else [value]
+        try:
+            found = [positions[v] for v in values 
+                     if not pd.isna(v) and v in positions]
+        except TypeError: # unhashable values
+            return np.flatnonzero(self.__matches(table[self.column], value))
+
+        if not found:
+            return np.array([], dtype=np.intp)
+        elif len(found) == 1:
+            return found[0]
+        else:
+            return np.unique(np.concatenate(found))
+
+
+    def __get_positions(self, table: gpd.GeoDataFrame) -> Optional[dict]:
+        """
+        Returns a dict mapping each value in the initialized column to the
+        positions of the rows containing it. The first lookup in a table 
+        and column only marks them, since one scan is cheaper than building
+        the index; the index is built on the second. Returns None until 
+        then or if the column isn't hashable.
+
+        """
+        if self.__positions is None or self.__positions[0] is not table:
+            self.__positions = (table, None, None)
+            return None
+
+        if self.__positions[1] is None:
+            try:
+                (codes, uniques) = pd.factorize(table[self.column])
+            except Exception:
+                return None
+
+            order = np.argsort(codes, kind='stable')
+            missing = np.count_nonzero(codes < 0)
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            self.__positions = (
+                    table, 
+                    dict(zip(uniques, np.split(order[missing:], 
+                                               np.cumsum(counts)[:-1]))),
+                    uniques if missing == 0 else None)
+
+        return self.__positions[1]
+
+
+    def __get_uniques(self, 
+                      table: gpd.GeoDataFrame
+                      ) -> Optional[Union[np.ndarray, pd.Categorical]]:
+        """
+        Returns the unique values of the initialized column in order of 
+        first appearance, as ``Series.unique`` does, from its value index 
+        if built. Returns None if it isn't built or the column has missing
+        values, which the index leaves out.
+
+        """
+        if self.__positions is None or self.__positions[0] is not table:
+            return None
+        return self.__positions[2]
+
+
+    def __compact(self, 
+                  gdf: gpd.GeoDataFrame, 
+                  max_unique_ratio: float
+                  ) -> gpd.GeoDataFrame:
+        """
+        Returns the table with numeric columns losslessly downcast and 
+        low-cardinality string columns converted to categoricals. Integers
+        are only downcast to signed types, and a column is only converted
+        if that makes it smaller.
+
+        """
+        compacted = {}
+        for (i, series) in enumerate(gdf[c] for c in gdf.columns):
+            if isinstance(series, gpd.GeoSeries) or \
+               gdf.columns[i] == 'geometry' or \
+               pd.api.types.is_bool_dtype(series):
+                continue
+
+            elif pd.api.types.is_integer_dtype(series) and len(series) > 0:
+                # Signed only, so that arithmetic on the column can't wrap
+                compacted[i] = pd.to_numeric(series, downcast='integer')
+
+            elif pd.api.types.is_float_dtype(series) and \
+                 series.dtype.itemsize > 4:
+                downcast = series.astype(np.float32)
+                if ((downcast == series) | series.isna()).all():
+                    compacted[i] = downcast
+
+            elif pd.api.types.is_object_dtype(series) and len(series) > 0 \
+                 and pd.api.types.infer_dtype(series) == 'string' and \
+                 series.nunique() <= max_unique_ratio * len(series):
+                compacted[i] = series.astype('category')
+
+        compacted = {i: series for (i, series) in compacted.items()
+                     if series.dtype != gdf.dtypes.iloc[i] and 
+                        series.memory_usage(deep=True) < 
+                        gdf.iloc[:, i].memory_usage(deep=True)}
+        if not compacted:
+            return gdf
+
+        gdf = gdf.copy(deep=False)
+        for (i, series) in compacted.items():
+            gdf.isetitem(i, series)
+
+        return gdf
+
+
+    def __clip(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """
+        Returns the rows of the table whose geometry intersects the `bbox`
+        and `mask`, found with the table's spatial index.
+
+        """
+        if (self.bbox is None and self.mask is None) or \
+           not self.__has_spatial_data(gdf):
+            return gdf
+
+        gdf = self.__geometrize_gdf(gdf) # decodes geometry held as WKT
+        rows = None
+        for geometry in self.__spatial_filters(gdf.crs):
+            found = gdf.sindex.query(geometry, predicate='intersects')
+            rows = found if rows is None else np.intersect1d(rows, found)
+
+        return gdf.take(np.sort(rows))
+
+
+    def __reproject(self, 
+                    gdf: gpd.GeoDataFrame, 
+                    crs: Optional[Union[str, int, pyproj.CRS]] = None
+                    ) -> gpd.GeoDataFrame:
+        """
+        Returns the table with its geometry reprojected to the given CRS
+        (default the initialized `crs`), using a cached transformer. Returns
+        the table itself if it is already in the CRS or has no geometry, 
+        and raises a ValueError if its geometry has no CRS to reproject 
+        from.
+
+        """
+        crs = self.crs if crs is None else pyproj.CRS.from_user_input(crs)
+        if crs is None or not self.__has_spatial_data(gdf):
+            return gdf
+        elif getattr(gdf, 'crs', None) is None: # as WKT held undecoded
+            raise ValueError("Unable to reproject to {}: the input's "
+                             "geometry has no CRS".format(crs.to_string()))
+        elif gdf.crs.equals(crs):
+            return gdf
+
+        geometry = np.asarray(gdf.geometry.values)
+        transformer = _get_transformer(gdf.crs.to_wkt(), crs.to_wkt(), 
+                                       threading.get_ident())
+        geometry = shapely.transform(
+                        geometry, 
+                        lambda xy: np.column_stack(transformer.transform(*xy.T)),
+                        include_z=bool(shapely.has_z(geometry).any()))
+
+        gdf = gdf.copy(deep=False)
+        gdf[gdf.geometry.name] = gpd.GeoSeries(geometry, index=gdf.index, 
+                                               crs=crs)
+        return gdf
+
+
+    def __query_geometry(
+            self, 
+            geometry: Union[shapely.geometry.base.BaseGeometry,
+                            List[shapely.geometry.base.BaseGeometry],
+                            gpd.GeoSeries, gpd.GeoDataFrame],
+            crs: Optional[object]
+            ) -> np.ndarray:
+        """
+        Returns an array of the given query geometries in the given CRS.
+
+        """
+        if isinstance(geometry, gpd.GeoDataFrame):
+            geometry = geometry.geometry
+        if isinstance(geometry, gpd.GeoSeries):
+            if crs is not None and geometry.crs is not None and \
+               not geometry.crs.equals(crs):
+                geometry = geometry.to_crs(crs)
+            return np.asarray(geometry.values)
+        elif isinstance(geometry, shapely.geometry.base.BaseGeometry):
+            return np.array([geometry])
+        else:
+            return np.asarray(list(geometry))
+
+
+    def __spatial_filters(self, 
+                          crs: Optional[object]
+                          ) -> List[shapely.geometry.base.BaseGeometry]:
+        """
+        Returns the `bbox` and `mask`, if set, as shapely geometries in the
+        given CRS.
+
+        """
+        filters = []
+        if self.bbox is not None:
+            filters.append(shapely.geometry.box(*self.bbox))
+        if self.mask is not None:
+            mask = self.mask
+            if crs is not None and mask.crs is not None and \
+               not mask.crs.equals(crs):
+                mask = mask.to_crs(crs)
+            filters.append(mask.unary_union)
+
+        return filters
+
+
+    def __matches(self, 
+                  series: pd.Series, 
+                  value: Union[str, List[str]]
+                  ) -> pd.Series:
+        if pd.api.types.is_list_like(value):
+            return series.isin(value)
+        else:
+            return series == value
+
+
+    def __get_table(self, 
+                    column: Optional[str], 
+                    value: Optional[Union[str, List[str]]]
+                    ) -> gpd.GeoDataFrame:
+        """
+        Returns the source table. If the table was read with a pushed-down
+        filter that excludes rows needed for the given column and value, 
+        re-reads the input file in full first.
+
+        """
+        if self.__predicate is not None:
+            (pcolumn, pvalue) = self.__predicate
+            values = value if pd.api.types.is_list_like(value) else [value]
+            pvalues = pvalue if pd.api.types.is_list_like(pvalue) \
+                        else [pvalue]
+
+            if column != pcolumn or value is None or \
+               not all(v in pvalues for v in values):
+                self.__predicate = None
+                (_, table, _) = self.__read_source(self.__infile)
+                if self.__compacted is not None:
+                    table = self.__compact(table, self.__compacted)
+                self.__set_table(table)
+
+        return self.__table
+
+
+    def __get_decoded_table(self, 
+                            column: Optional[str], 
+                            value: Optional[Union[str, List[str]]]
+                            ) -> gpd.GeoDataFrame:
+        """
+        Returns the source table, as __get_table, first decoding its 
+        geometry in place if held as WKT.
+
+        """
+        table = self.__get_table(column, value)
+        if not isinstance(table, gpd.GeoDataFrame) and \
+           'geometry' in table.columns:
+            self.__set_table(self.__geometrize_gdf(table))
+
+        return self.__table
+
+
+    def __where_clause(self, 
+                       column: str, 
+                       value: Union[str, List[str]]
+                       ) -> str:
+        """
+        Given a column and value(s), returns an OGR SQL attribute filter
+        selecting rows whose column contains the value(s).
+
+        """
+        values = value if pd.api.types.is_list_like(value) else [value]
+        literals = []
+        for v in values:
+            if isinstance(v, (int, float, np.number)) and \
+               not isinstance(v, bool):
+                literals.append(str(v))
+            else:
+                literals.append("'{}'".format(str(v).replace("'", "''")))
+
+        return '"{}" IN ({})'.format(column.replace('"', '""'), 
+                                     ', '.join(literals))
+
+
+    def __is_streamed(self) -> bool:
+        return self.__table is None and self.__infile is not None and \
+               not self.__pending
+
+
+    def __read_chunks(self, 
+                      filename: str, 
+                      chunksize: Optional[int],
+                      predicate: Optional[Tuple[str, 
+                                                Union[str, List[str]]]] = None
+                      ) -> Iterator[gpd.GeoDataFrame]:
+        """
+        Given a filename, returns an iterator of geometrized GeoDataFrames
+        of at most `chunksize` rows each. CSVs are parsed chunk by chunk, 
+        Parquet files batch by batch, and OGR formats (including zipped 
+        ones) feature by feature. Other formats cannot be streamed and are 
+        read whole, then sliced.
+
+        If given a (column, value) predicate, only matching rows are yielded.
+        CSV rows are filtered before geometrization and OGR features are
+        filtered by the driver, so non-matching geometries are never decoded.
+
+        """
+        filenames = self.__expand_sources(filename)
+        if filenames is not None: # read one after another
+            for name in filenames:
+                for gdf in self.__read_chunks(name, chunksize, predicate):
+                    yield self.__add_source(gdf, name)
+            return
+
+        ext = self.__get_extension(filename)
+        engine = self.__get_engine(ext, 'read', predicate, 
+                                   streaming=chunksize is not None)
+
+        if ext == '.zip':
+            yield from self.__read_chunks(self.__list_zip_members(filename)[0],
+                                          chunksize, predicate)
+
+        elif engine not in BUILTIN_ENGINES and \
+             'streaming' in ENGINES[engine].capabilities:
+            with self.__open(filename) as file:
+                for df in ENGINES[engine].read(
+                        file, self.__engine_options(predicate, chunksize)):
+                    df = self.__project(df)
+                    if predicate is not None:
+                        df = self.__select(df, *predicate)
+                    yield self.__clip(self.__geometrize_gdf(df))
+
+        elif ext == '.csv' and engine in BUILTIN_ENGINES:
+            # pyarrow's streaming CSV reader infers types from its first
+            # block alone, so CSVs are streamed with pandas
+            for df in self.__read_csv_chunks(filename, chunksize):
+                if predicate is not None:
+                    df = self.__select(df, *predicate)
+                if not self.__defers_geometry(df):
+                    df = self.__geometrize_gdf(gpd.GeoDataFrame(df))
+                yield self.__clip(df) # decodes WKT only to clip
+
+        elif engine == 'pyarrow' and ext in ['.parquet', '.geoparquet']:
+            for gdf in self.__read_parquet_batches(filename, chunksize):
+                if predicate is not None:
+                    gdf = self.__select(gdf, *predicate)
+                yield self.__clip(gdf)
+
+        elif engine != 'fiona': # can't be streamed, so read whole
+            (_, gdf, _) = self.__read_file(filename)
+            if predicate is not None:
+                gdf = self.__select(gdf, *predicate)
+            chunksize = chunksize if chunksize is not None else len(gdf)
+            for i in range(0, len(gdf), max(chunksize, 1)):
+                yield gdf.iloc[i:i + chunksize]
+
+        else:
+            with fiona.open(filename, include_fields=self.__columns,
+                            encoding=self.encoding) as source:
+                columns = list(source.schema['properties']) + ['geometry']
+                self.__usecols(columns)
+                kwargs = {}
+                if predicate is not None:
+                    kwargs['where'] = self.__where_clause(*predicate)
+                if self.mask is not None:
+                    kwargs['mask'] = shapely.geometry.mapping(
+                                        self.__spatial_filters(
+                                            source.crs_wkt or None)[-1])
+                elif self.bbox is not None:
+                    kwargs['bbox'] = self.bbox
+                features = iter(source.filter(**kwargs))
+
+                while True:
+                    chunk = list(itertools.islice(features, chunksize))
+                    if not chunk:
+                        break
+                    gdf = gpd.GeoDataFrame.from_features(
+                                chunk, crs=source.crs_wkt)[columns]
+                    if predicate is not None:
+                        gdf = self.__select(gdf, *predicate)
+                    yield self.__clip(gdf)
+
+
+    def __peek_schema(self, filename: str) -> List[str]:
+        """
+        Returns the column labels of a streamed input's chunks. A CSV's are
+        read from its header, other inputs' from their first chunk.
+
+        """
+        ext = self.__get_extension(filename)
+        if self.__expand_sources(filename) is None and ext == '.csv' and \
+           self.__get_engine(ext, 'read', streaming=True) in BUILTIN_ENGINES:
+            labels = list(self.__read_csv(filename, nrows=0).columns)
+            return self.__usecols(labels) or labels
+
+        return list(next(self.__read_chunks(filename, self.chunksize)).columns)
+
+
+    def __read_csv_chunks(self, 
+                          filename: str, 
+                          chunksize: Optional[int]
+                          ) -> Iterator[pd.DataFrame]:
+        if chunksize is None:
+            yield self.__read_inferred(filename, '.csv')
+            return
+
+        usecols = self.__usecols(self.__read_csv(filename, nrows=0).columns)
+        encoding = self.__detect_encoding(filename)
+        dtype = self.__csv_dtypes(filename, encoding, usecols, chunksize)
+        with self.__open(filename) as file:
+            yield from pd.read_csv(file, encoding=encoding, dtype=dtype,
+                                   usecols=usecols, chunksize=chunksize)
+
+
+    def __csv_dtypes(self, 
+                     filename: str, 
+                     encoding: str,
+                     usecols: Optional[List[str]],
+                     chunksize: int
+                     ) -> dict:
+        """
+        Returns dtypes pinning the columns of a CSV to the dtypes they have
+        when the whole file is read, found in a first pass over the file in
+        chunks, so that every chunk is parsed alike. Columns inferred as 
+        strings in any chunk are read as strings, and columns of integers 
+        in some chunks and floats in others as floats. The dtypes are 
+        cached per file, columns and chunk size.
+
+        """
+        key = (filename, None if usecols is None else tuple(usecols), 
+               chunksize)
+        if key in self.__dtypes:
+            return self.__dtypes[key]
+
+        found = collections.defaultdict(set)
+        with self.__open(filename) as file:
+            for df in pd.read_csv(file, encoding=encoding, usecols=usecols,
+                                  chunksize=chunksize):
+                self.__add_dtypes(found, df)
+
+        self.__dtypes[key] = self.__unify_dtypes(found)
+        return self.__dtypes[key]
+
+
+    def __add_dtypes(self, found: dict, df: pd.DataFrame) -> NoReturn:
+        """
+        Adds the dtype of each column of a chunk to the set of its dtypes 
+        in `found`, or None if the column is all null in the chunk.
+
+        """
+        for (column, dtype) in df.dtypes.items():
+            found[column].add(dtype if df[column].notna().any() else None)
+
+
+    def __unify_dtypes(self, found: dict) -> dict:
+        """
+        Given the sets of dtypes of the columns of a CSV's chunks, returns
+        dtypes pinning the columns whose chunks disagree to the dtype they 
+        have when the whole file is read. Columns inferred as strings in 
+        some chunks and otherwise in others are read as strings, and 
+        columns of integers in some chunks and floats or nulls in others 
+        as floats.
+
+        """
+        dtype = {}
+        for (column, dtypes) in found.items():
+            kinds = dtypes - {None}
+            numeric = all(pd.api.types.is_numeric_dtype(d) and 
+                          not pd.api.types.is_bool_dtype(d) for d in kinds)
+            if len(kinds) > 1 and not numeric:
+                dtype[column] = str
+            elif len(dtypes) > 1 and kinds and numeric:
+                dtype[column] = np.float64
+
+        return dtype
+
+
+    def __list_streamed_values(self, 
+                               column: Optional[str], 
+                               unique: bool
+                               ) -> np.ndarray:
+        if column is None:
+            raise RuntimeError("No initialized column exists")
+        elif column not in self.__schema:
+            raise KeyError("Unable to find column '{}'".format(column))
+
+        values = []
+        for gdf in self.__read_chunks(self.infile, self.chunksize):
+            if unique:
+                values.append(gdf[column].unique())
+            else:
+                values.append(gdf[column].values)
+
+        if unique:
+            return pd.unique(np.concatenate(values))
+        else:
+            return np.concatenate(values)
+
+
+    def __extract_chunks_to_file(
+            self, 
+            filename: Optional[pathlib.Path], 
+            driver: Optional[str],
+            crs: Optional[Union[str, int, pyproj.CRS]] = None
+            ) -> NoReturn:
+        """
+        Writes streamed chunks to a file one chunk at a time. CSV and 
+        appendable OGR outputs (.shp, .gpkg, or a given driver) are written
+        incrementally; other outputs are concatenated and written at once.
+
+        """
+        chunks = map(lambda gdf: self.__reproject(gdf, crs), 
+                     self.__iter_streamed(self.chunksize))
+        first = next(chunks, None)
+        if first is None:
+            return
+
+        is_geometric = 'geometry' in self.__schema
+        chunks = itertools.chain([first], chunks)
+
+        if filename is None:
+            for (i, gdf) in enumerate(chunks):
+                self.__drop_empty_geometry(gdf, is_geometric).to_string(
+                        buf=sys.stdout, header=(i == 0), index_names=(i == 0))
+                sys.stdout.write('\n')
+            return
+
+        parent = pathlib.Path(filename).parent
+        if not parent.exists():
+            os.makedirs(parent)
+
+        if self.__is_appendable(filename, driver, is_geometric):
+            for (i, gdf) in enumerate(chunks):
+                self.__append_file(gdf, filename, driver, is_geometric, 
+                                   'w' if i == 0 else 'a')
+        else:
+            self.__write_file(pd.concat(list(chunks)), filename, driver, 
+                              is_geometric)
+
+
+    def __is_appendable(self, 
+                        filename: pathlib.Path, 
+                        driver: Optional[str], 
+                        is_geometric: bool
+                        ) -> bool:
+        ext = self.__get_extension(filename)
+        if driver is None and \
+           self.__get_engine(ext, 'write') not in BUILTIN_ENGINES:
+            return False # written whole by the engine
+
+        return ext in STREAM_FORMATS or (is_geometric and 
+                        (ext in ['.shp', '.gpkg'] or driver is not None))
+
+
+    def __append_file(self, 
+                      gdf: gpd.GeoDataFrame, 
+                      filename: pathlib.Path, 
+                      driver: Optional[str], 
+                      is_geometric: bool,
+                      mode: str
+                      ) -> NoReturn:
+        """
+        Writes (mode 'w') or appends (mode 'a') rows to a file of one of
+        the STREAM_FORMATS or an appendable OGR file (.shp, .gpkg, or a 
+        given driver).
+
+        """
+        ext = self.__get_extension(filename)
+        if ext in STREAM_FORMATS:
+            with open(filename, mode, newline='', encoding='utf-8') as out:
+                self.__write_stream(iter([gdf]), out, STREAM_FORMATS[ext], 
+                                    is_geometric, header=(mode == 'w'))
+        else:
+            if driver is None:
+                driver = 'ESRI Shapefile' if ext == '.shp' else 'GPKG'
+            self.__decategorize(self.__geometrize_gdf(gdf)).to_file(
+                    filename, driver=driver, mode=mode)
+
+
+    def __write_stream(self, 
+                       chunks: Iterator[gpd.GeoDataFrame], 
+                       buf: IO[str], 
+                       fmt: str, 
+                       is_geometric: bool,
+                       header: bool = True
+                       ) -> NoReturn:
+        """
+        Writes chunks to a text buffer one at a time, as 'csv', 'tsv',
+        'ndjson' (one JSON object per row, geometry as WKT) or 'geojsonseq'
+        (one GeoJSON Feature per row, in WGS 84). Only one chunk is held at
+        a time.
+        If `header` is False, the CSV/TSV header row is not written.
+
+        """
+        has_index = self.column is not None
+
+        for gdf in chunks:
+            if gdf.empty:
+                continue
+
+            if fmt in ['csv', 'tsv']:
+                self.__drop_empty_geometry(gdf, is_geometric).to_csv(
+                        buf, sep=',' if fmt == 'csv' else '\t', 
+                        index=has_index, header=header)
+
+            elif fmt == 'ndjson':
+                df = self.__drop_empty_geometry(gdf, is_geometric)
+                if is_geometric and isinstance(gdf, gpd.GeoDataFrame):
+                    df = df.assign(geometry=gdf.geometry.to_wkt())
+                if has_index:
+                    df = df.reset_index()
+                lines = df.to_json(orient='records', lines=True, 
+                                   force_ascii=False, date_format='iso',
+                                   default_handler=str)
+                buf.write(lines if lines.endswith('\n') else lines + '\n')
+
+            elif fmt == 'geojsonseq': # RFC 8142; coordinates in WGS 84
+                features = self.__geometrize_gdf(
+                        gdf.reset_index() if has_index else gdf)
+                if is_geometric and features.crs is not None and \
+                   not features.crs.equals('EPSG:4326'):
+                    features = features.to_crs('EPSG:4326')
+                for feature in features.iterfeatures(na='null', 
+                                                     show_bbox=False,
+                                                     drop_id=has_index):
+                    buf.write(json.dumps(feature, default=str) + '\n')
+
+            else:
+                raise ValueError("Unsupported format: {}".format(fmt))
+
+            header = False
+
+
+    def __write_file(self, 
+                     gdf: gpd.GeoDataFrame, 
+                     filename: pathlib.Path, 
+                     driver: Optional[str], 
+                     is_geometric: bool
+                     ) -> NoReturn:
+        ext = self.__get_extension(filename)
+
+        has_index = self.column is not None
+        engine = self.__get_engine(ext, 'write')
+        if driver is None and engine not in BUILTIN_ENGINES:
+            ENGINES[engine].write(self.__geometrize_gdf(gdf) if is_geometric
+                                  else self.__drop_empty_geometry(gdf, False),
+                                  filename, has_index)
+            return
+
+        is_ogr = ext in ['.shp', '.geojson', '.gpkg'] or driver is not None
+        if is_geometric and (is_ogr or ext in ['.parquet', '.geoparquet', 
+                                               '.feather', '.arrow']):
+            gdf = self.__geometrize_gdf(gdf) # decodes geometry held as WKT
+        if is_geometric and is_ogr:
+            gdf = self.__decategorize(gdf)
+
+        if is_geometric and ext == '.shp':
+            gdf.to_file(filename)
+        elif is_geometric and ext in ['.parquet', '.geoparquet']:
+            gdf.to_parquet(filename, index=has_index)
+        elif is_geometric and ext in ['.feather', '.arrow']:
+            gdf.to_feather(filename, index=has_index)
+        elif is_geometric and ext == '.geojson':
+            gdf.to_file(filename, driver='GeoJSON')
+        elif is_geometric and ext == '.gpkg':
+            gdf.to_file(filename, driver='GPKG')
+        elif is_geometric and driver is not None:
+            gdf.to_file(filename, driver=driver)
+        elif ext in STREAM_FORMATS:
+            self.__append_file(gdf, filename, driver, is_geometric, 'w')
+        elif is_geometric:
+            self.__extract_to_inferred_file(
+                    pd.DataFrame(gdf), filename, ext)
+        else:
+            self.__extract_to_inferred_file(
+                    self.__drop_empty_geometry(gdf, is_geometric), 
+                    filename, ext)
+
+
+    def __decategorize(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """
+        Returns the table with categorical columns and index converted back
+        to their categories' dtype, which OGR drivers can write.
+
+        """
+        columns = [i for (i, dtype) in enumerate(gdf.dtypes)
+                   if pd.api.types.is_categorical_dtype(dtype)]
+        is_categorical = pd.api.types.is_categorical_dtype(gdf.index)
+        if not columns and not is_categorical:
+            return gdf
+
+        gdf = gdf.copy(deep=False)
+        for i in columns:
+            series = gdf.iloc[:, i]
+            gdf.isetitem(i, series.astype(series.cat.categories.dtype))
+        if is_categorical:
+            gdf.index = gdf.index.astype(gdf.index.categories.dtype)
+
+        return gdf
+
+
+    def __drop_empty_geometry(self, 
+                              gdf: gpd.GeoDataFrame, 
+                              is_geometric: bool
+                              ) -> pd.DataFrame:
+        if is_geometric:
+            return pd.DataFrame(gdf)
+        elif 'geometry' not in gdf.columns:
+            return gdf
+        else:
+            return pd.DataFrame(gdf).drop(columns='geometry')
+
+
+    def __get_extension(self, filename: str) -> str:
+        (_, extension) = os.path.splitext(filename)
+        return extension.lower()
+
+
+    def __read_source(self, 
+                      filename: str,
+                      predicate: Optional[Tuple[str, 
+                                                Union[str, List[str]]]] = None,
+                      reproject: bool = True
+                      ) -> Tuple[str, gpd.GeoDataFrame, bool]:
+        """
+        Given a filename, returns a tuple of the file's name, a 
+        GeoDataFrame of its tabular data and whether the (column, value) 
+        predicate, if given, filtered its rows. The data is loaded from the
+        parse cache if one is set and holds the file as read with the 
+        current options, and reprojected to the initialized `crs` unless 
+        `reproject` is False.
+
+        """
+        filenames = self.__expand_sources(filename)
+        if filenames is not None:
+            (gdf, filtered) = self.__read_sources(filenames, predicate)
+        elif self.cache_dir is None:
+            (filename, gdf, filtered) = self.__read_file(filename, predicate)
+        else:
+            key = self.__cache_key(filename, predicate)
+            gdf = self.__load_cached(key)
+            if gdf is None:
+                (filename, gdf, filtered) = self.__read_file(filename, 
+                                                             predicate)
+                self.__store_cached(key, gdf)
+            else: # reads filter whenever the file has the column
+                filtered = predicate is not None and predicate[0] in gdf
+
+        return (filename, self.__reproject(gdf) if reproject else gdf, 
+                filtered)
+
+
+    def __read_sources(self, 
+                       filenames: List[str],
+                       predicate: Optional[Tuple[str, 
+                                                 Union[str, List[str]]]] = None
+                       ) -> Tuple[gpd.GeoDataFrame, bool]:
+        """
+        Given a list of filenames, reads the files in a pool of threads and
+        returns a tuple of their concatenated tabular data, with a 
+        SOURCE_COLUMN naming each row's file, and whether the predicate 
+        filtered every file. Tables are reprojected to the first file's CRS.
+
+        """
+        read = lambda name: self.__read_source(name, predicate, 
+                                               reproject=False)
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            reads = list(executor.map(read, filenames))
+            filtered = all(f for (_, _, f) in reads)
+
+            if predicate is not None and not filtered:
+                # a file lacks the predicate's column, so read all in full
+                reads = list(executor.map(
+                            lambda name: self.__read_source(name, 
+                                                            reproject=False),
+                            filenames))
+
+        tables = [self.__add_source(gdf, name) 
+                  for (name, (_, gdf, _)) in zip(filenames, reads)]
+
+        if any(isinstance(t, gpd.GeoDataFrame) for t in tables):
+            tables = [self.__geometrize_gdf(t) for t in tables]
+
+        crs = next((t.crs for t in tables 
+                    if self.__has_spatial_data(t) and 
+                       getattr(t, 'crs', None) is not None), None)
+        for (i, table) in enumerate(tables):
+            if crs is not None and self.__has_spatial_data(table) and \
+               table.crs is not None and not table.crs.equals(crs):
+                tables[i] = table.to_crs(crs)
+
+        table = pd.concat(tables, ignore_index=True)
+        if not isinstance(table, gpd.GeoDataFrame):
+            return (table, filtered)
+        else:
+            return (self.__geometrize_gdf(table), filtered)
+
+
+    def __expand_sources(self, 
+                         infile: Union[str, List[str], pd.DataFrame]
+                         ) -> Optional[List[str]]:
+        """
+        Returns the list of filenames named by a list of names/paths or a 
+        glob pattern, or None if given a single name/path or other data.
+
+        """
+        if isinstance(infile, (list, tuple)) and len(infile) > 0 and \
+           all(isinstance(f, (str, os.PathLike)) for f in infile):
+            return [str(f) for f in infile]
+        elif isinstance(infile, (str, os.PathLike)) and \
+             re.search(r'[*?[]', str(infile)) and not os.path.exists(infile):
+            filenames = sorted(glob.glob(str(infile), recursive=True))
+            if not filenames:
+                raise FileNotFoundError("No files match '{}'".format(infile))
+            return filenames
+        else:
+            return None
+
+
+    def __is_path(self, infile: Union[str, List[str], pd.DataFrame]) -> bool:
+        return isinstance(infile, (str, os.PathLike)) or \
+               self.__expand_sources(infile) is not None
+
+
+    def __add_source(self, 
+                     gdf: gpd.GeoDataFrame, 
+                     filename: str
+                     ) -> gpd.GeoDataFrame:
+        gdf = gdf.copy(deep=False)
+        gdf[SOURCE_COLUMN] = str(filename)
+        return gdf
+
+
+    def __cache_key(self, 
+                    filename: str, 
+                    predicate: Optional[Tuple[str, Union[str, List[str]]]]
+                    ) -> str:
+        stat = os.stat(filename)
+        options = [os.path.abspath(filename), stat.st_size, stat.st_mtime_ns,
+                   self.__columns, repr(predicate), self.encoding,
+                   self.engine,
+                   self.bbox, None if self.mask is None else 
+                        [list(self.mask.to_wkt()), str(self.mask.crs)]]
+        return hashlib.sha256(json.dumps(options).encode()).hexdigest()
+
+
+    def __load_cached(self, key: str) -> Optional[gpd.GeoDataFrame]:
+        for ext in ['.parquet', '.pkl']:
+            path = self.cache_dir / (key + ext)
+            try:
+                if ext == '.parquet':
+                    gdf = self.__read_cached_parquet(path)
+                else:
+                    gdf = pd.read_pickle(path)
+            except:
+                continue
+
+            os.utime(path) # marks entry as recently used
+            return gdf
+
+        return None
+
+
+    def __read_cached_parquet(self, 
+                              path: pathlib.Path
+                              ) -> Union[gpd.GeoDataFrame, pd.DataFrame]:
+        try:
+            return gpd.read_parquet(path)
+        except ValueError: # cached without geometry
+            return pd.read_parquet(path)
+
+
+    def __store_cached(self, key: str, gdf: gpd.GeoDataFrame) -> NoReturn:
+        """
+        Writes a parsed table to the cache as GeoParquet, or as a pickle if
+        pyarrow is unavailable or can't represent it, then evicts least 
+        recently used entries until the cache fits CACHE_SIZE_LIMIT.
+
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        partial = self.cache_dir / '{}.{}.{}.partial'.format(
+                        key, os.getpid(), threading.get_ident())
+        try:
+            gdf.to_parquet(partial)
+            os.replace(partial, self.cache_dir / (key + '.parquet'))
+        except:
+            gdf.to_pickle(partial)
+            os.replace(partial, self.cache_dir / (key + '.pkl'))
+
+        try:
+            entries = sorted(list(self.cache_dir.glob('*.parquet')) + 
+                             list(self.cache_dir.glob('*.pkl')), 
+                             key=os.path.getmtime)
+            size = sum(os.path.getsize(entry) for entry in entries)
+            for entry in entries[:-1]:
+                if size <= CACHE_SIZE_LIMIT:
+                    break
+                size -= os.path.getsize(entry)
+                os.remove(entry)
+        except FileNotFoundError: # evicted by a concurrent read
+            pass
+
+
+    def __read_file(self, 
+                    filename: str,
+                    predicate: Optional[Tuple[str, 
+                                              Union[str, List[str]]]] = None
+                    ) -> Tuple[str, gpd.GeoDataFrame, bool]:
+        """
+        Given a filename, returns a tuple of a tabular file's name, a 
+        GeoDataFrame containing tabular data and whether the (column, 
+        value) predicate, if given, filtered it. Only matching rows are read
+        and geometrized, unless the file lacks the predicate's column.
+
+        """
+        ext = self.__get_extension(filename)
+
+        if ext != '.zip':
+            engine = self.__get_engine(ext, 'read', predicate)
+            if engine == 'fiona':
+                gdf = self.__read_ogr(filename, predicate)
+            else:
+                try: # gpd has df init problems. Fix: try converting pd read
+                    gdf = self.__read_engine(engine, filename, ext, predicate)
+                    if not isinstance(gdf, pd.DataFrame) or \
+                       not self.__defers_geometry(gdf):
+                        gdf = gpd.GeoDataFrame(gdf)
+                except:
+                    gdf = self.__read_ogr(filename, predicate)
+
+            gdf = self.__project(gdf)
+            filtered = predicate is not None and predicate[0] in gdf.columns
+            if filtered:
+                gdf = self.__select(gdf, *predicate)
+
+            if not isinstance(gdf, gpd.GeoDataFrame):
+                gdf = self.__clip(gdf) # decoded on first use
+            else:
+                gdf = self.__clip(self.__geometrize_gdf(gdf))
+            return (filename, gdf, filtered)
+        else:
+            return self.__read_zip(filename, predicate)
+
+
+    def __read_ogr(self, 
+                   filename: str,
+                   predicate: Optional[Tuple[str, 
+                                             Union[str, List[str]]]] = None
+                   ) -> gpd.GeoDataFrame:
+        kwargs = {}
+        if self.__columns is not None:
+            kwargs['include_fields'] = self.__columns
+        if self.encoding is not None:
+            kwargs['encoding'] = self.encoding
+        if self.mask is not None: # bbox and mask are mutually exclusive
+            kwargs['mask'] = self.mask
+        elif self.bbox is not None:
+            kwargs['bbox'] = self.bbox
+
+        if predicate is not None:
+            try: # drivers filter features before decoding them
+                return gpd.read_file(
+                        filename, where=self.__where_clause(*predicate),
+                        **kwargs)
+            except:
+                pass
+
+        return gpd.read_file(filename, **kwargs)
+
+
+    def __project(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        usecols = self.__usecols(gdf.columns)
+        if usecols is None or len(usecols) == len(gdf.columns):
+            return gdf
+        else:
+            return gdf[usecols]
+
+
+    def __usecols(self, labels: List[str]) -> Optional[List[str]]:
+        """
+        Given the column labels of a source table, returns the labels to 
+        read (the projected columns and geometry), or None to read all.
+
+        """
+        if self.__columns is None:
+            return None
+
+        missing = [c for c in self.__columns if c not in labels]
+        if missing:
+            raise KeyError("Columns not found: {}".format(missing))
+
+        wanted = set(self.__columns) | {'geometry'}
+        return [label for label in labels if label in wanted]
+
+
+    def __read_zip(self, 
+                   filename: str,
+                   predicate: Optional[Tuple[str, 
+                                             Union[str, List[str]]]] = None
+                   ) -> Tuple[str, gpd.GeoDataFrame, bool]:
+        """
+        Helper to self.__read_file. Reads members of given zipfiles in 
+        place, without extracting them to disk. Unlike gpd, can handle 
+        relative paths and doesn't require 'zip:///' prepend.
+
+        """
+        gdf = None
+
+        for member in self.__list_zip_members(filename):
+            try:
+                (_, gdf, filtered) = self.__read_file(member, predicate)
+                break
+            except:
+                continue
+
+        if gdf is None:
+            raise FileNotFoundError("No file found in {}".format(filename))
+        else:
+            return (filename, gdf, filtered)
+        
+
+    def __list_zip_members(self, filename: str) -> List[str]:
+        """
+        Given a zipfile filename, returns GDAL virtual filesystem paths
+        (``/vsizip/{archive}/member``) of the files in the archive, ordered
+        by ZIP_MEMBER_PRIORITY and then by their order in the archive. 
+        Hidden files are skipped. Only the archive directory is read.
+
+        """
+        if not filename.startswith('/vsizip/'):
+            filename = os.path.abspath(filename)
+
+        with self.__open(filename) as archive:
+            with zipfile.ZipFile(archive, 'r') as zipped:
+                names = [name for name in zipped.namelist() 
+                         if not name.endswith('/') and 
+                            not os.path.basename(name).startswith('.') and
+                            not name.startswith('__MACOSX')]
+
+        priority = lambda name: ZIP_MEMBER_PRIORITY.index(
+                        self.__get_extension(name)) \
+                    if self.__get_extension(name) in ZIP_MEMBER_PRIORITY \
+                    else len(ZIP_MEMBER_PRIORITY)
+
+        return ['/vsizip/{{{}}}/{}'.format(filename, name) 
+                for name in sorted(names, key=priority)]
+
+
+    @contextlib.contextmanager
+    def __open(self, filename: str) -> Iterator[Union[str, IO[bytes]]]:
+        """
+        Given a filename, yields something pandas can read from: the 
+        filename itself, or an open file object for zip archive members. 
+        Members of nested archives are buffered in memory.
+
+        """
+        member = re.match(r'^/vsizip/\{(.*)\}/(.+)$', str(filename))
+        if member is None:
+            yield filename
+            return
+
+        (archive, name) = member.groups()
+        with self.__open(archive) as source:
+            with zipfile.ZipFile(source, 'r') as zipped:
+                with zipped.open(name) as file:
+                    if self.__get_extension(name) == '.zip':
+                        yield io.BytesIO(file.read())
+                    else:
+                        yield file
+
+
+    def __has_spatial_data(self, gdf: gpd.GeoDataFrame) -> bool:
+        if gdf is self.__table:
+            return self.__spatial
+        elif self.__table is not None and \
+             (not self.__spatial or len(gdf) == self.__rows):
+            return self.__spatial # a flat table's subsets are flat, and an
+                                  # extraction of every row is the table
+        else:
+            return 'geometry' in gdf.columns and \
+                   not gdf['geometry'].isna().all()
+
+
+    def __set_table(self, table: gpd.GeoDataFrame) -> NoReturn:
+        """
+        Sets the source table and computes its metadata once: its schema,
+        whether it has geometry, and its row count. The CRS is not cached
+        as GeoDataFrame.crs is already a constant-time lookup.
+
+        """
+        self.__table = table
+        self.__result = None
+        self.__schema = list(table.columns)
+        self.__spatial = 'geometry' in table.columns and \
+                         not table['geometry'].isna().all()
+        self.__rows = len(table)
+
+
+    def __get_engine(self, 
+                     ext: str, 
+                     mode: str,
+                     predicate: Optional[Tuple[str, 
+                                               Union[str, List[str]]]] = None,
+                     streaming: bool = False
+                     ) -> str:
+        """
+        Returns the name of the engine with which to 'read' or 'write' 
+        (mode) files of the given extension: the initialized `engine` if it
+        handles them, else the preferred engine that does. Reads prefer the
+        first engine for the extension with the capabilities they need: 
+        'streaming' if `streaming`, 'projection' if `columns` are set, 
+        'pushdown' if given a predicate and 'bbox' if a `bbox` or `mask` is.
+
+        Raises a ValueError if the initialized engine handles the extension
+        but can't read or write it.
+
+        """
+        names = [name for name in list_engines(ext) 
+                 if name in BUILTIN_ENGINES or 
+                    getattr(ENGINES[name], mode) is not None]
+        if self.engine in names:
+            return self.engine
+        elif self.engine is not None and self.engine in list_engines(ext):
+            raise ValueError("Engine '{}' can't {} '{}' files".format(
+                                self.engine, mode, ext))
+        elif mode == 'write':
+            return names[0]
+
+        needs = [capability for (capability, needed) in [
+                    ('streaming', streaming), 
+                    ('projection', self.__columns is not None),
+                    ('pushdown', predicate is not None), 
+                    ('bbox', self.bbox is not None or self.mask is not None)]
+                 if needed]
+        # An engine for any extension stays the last resort
+        capable = [name for name in names 
+                   if ENGINES[name].extensions is not None and 
+                      all(c in ENGINES[name].capabilities for c in needs)]
+        return (capable or names)[0]
+
+
+    def __engine_options(self, 
+                         predicate: Optional[Tuple[str, 
+                                                   Union[str, List[str]]]],
+                         chunksize: Optional[int] = None
+                         ) -> dict:
+        return {'columns': self.__columns, 'predicate': predicate, 
+                'bbox': self.bbox, 'encoding': self.encoding, 
+                'chunksize': chunksize}
+
+
+    def __read_engine(self, 
+                      engine: str, 
+                      filename: str, 
+                      ext: str,
+                      predicate: Optional[Tuple[str, 
+                                                Union[str, List[str]]]] = None
+                      ) -> pd.DataFrame:
+        if engine == 'pandas':
+            return self.__read_inferred(filename, ext, predicate)
+        elif engine == 'pyarrow':
+            return self.__read_arrow(filename, ext)
+
+        with self.__open(filename) as file:
+            return ENGINES[engine].read(
+                        file, self.__engine_options(predicate))
+
+
+    def __read_inferred(self, 
+                        filename: str, 
+                        ext: str,
+                        predicate: Optional[Tuple[
+                                        str, Union[str, List[str]]]] = None
+                        ) -> pd.DataFrame:
+        if ext == '.csv' and predicate is not None:
+            return self.__read_csv_where(filename, *predicate)
+        elif ext == '.csv' and self.__columns is not None:
+            return self.__read_csv(filename, usecols=self.__usecols(
+                                self.__read_csv(filename, nrows=0).columns))
+        elif ext == '.csv':
+            return self.__read_csv(filename)
+
+        with self.__open(filename) as file:
+            if ext == '.pkl' or ext == '.bz2' or ext == '.zip' or \
+               ext == '.gzip' or ext == '.xz':
+                compression = {'.bz2': 'bz2', '.gzip': 'gzip', '.xz': 'xz', 
+                               '.zip': 'zip'}.get(ext)
+                return pd.read_pickle(file, compression=compression)
+            elif ext == '.xlsx':
+                return pd.read_excel(file)
+            elif ext == '.html':
+                return pd.read_html(file)
+            elif ext == '.json':
+                return pd.read_json(file)
+            else:
+                raise FileNotFoundError('Cannot read {}'.format(filename))
+
+
+    def __read_arrow(self, filename: str, ext: str) -> gpd.GeoDataFrame:
+        """
+        Reads a Parquet or Feather (Arrow IPC) file. Only projected columns
+        are read, and local files are memory-mapped rather than copied into
+        memory before conversion. GeoParquet/GeoArrow geometry columns are
+        decoded and given their stored CRS.
+
+        """
+        if pyarrow is None:
+            raise ImportError("Reading {} files requires pyarrow".format(ext))
+        elif ext == '.csv':
+            return self.__read_arrow_csv(filename)
+
+        with self.__open(filename) as file:
+            memory_map = isinstance(file, str)
+            if ext in ['.parquet', '.geoparquet']:
+                schema = pyarrow.parquet.read_schema(file, 
+                                                     memory_map=memory_map)
+                columns = self.__arrow_usecols(schema)
+                table = pyarrow.parquet.read_table(file, columns=columns, 
+                                                   memory_map=memory_map)
+            else:
+                source = pyarrow.memory_map(file) if memory_map else file
+                schema = pyarrow.ipc.open_file(source).schema
+                columns = self.__arrow_usecols(schema)
+                table = pyarrow.feather.read_table(file, columns=columns,
+                                                   memory_map=memory_map)
+
+        return self.__arrow_to_gdf(table)
+
+
+    def __read_arrow_csv(self, filename: str) -> pd.DataFrame:
+        """
+        Reads a CSV with pyarrow's multithreaded parser. Columns are named
+        as pandas names them, and only projected columns are converted.
+
+        """
+        header = self.__read_csv(filename, nrows=0).columns
+        read_options = pyarrow.csv.ReadOptions(
+                            column_names=list(header), skip_rows=1,
+                            encoding=self.__detect_encoding(filename))
+        convert_options = pyarrow.csv.ConvertOptions()
+        usecols = self.__usecols(header)
+        if usecols is not None:
+            convert_options.include_columns = usecols
+
+        with self.__open(filename) as file:
+            table = pyarrow.csv.read_csv(file, read_options=read_options,
+                                         convert_options=convert_options)
+
+        return self.__arrow_to_gdf(table)
+
+
+    def __read_parquet_batches(self, 
+                               filename: str, 
+                               chunksize: Optional[int]
+                               ) -> Iterator[gpd.GeoDataFrame]:
+        if pyarrow is None:
+            raise ImportError("Reading Parquet files requires pyarrow")
+
+        with self.__open(filename) as file:
+            parquet = pyarrow.parquet.ParquetFile(
+                            file, memory_map=isinstance(file, str))
+            columns = self.__arrow_usecols(parquet.schema_arrow)
+            for batch in parquet.iter_batches(
+                            batch_size=chunksize or 65536, columns=columns):
+                yield self.__geometrize_gdf(self.__arrow_to_gdf(
+                            pyarrow.Table.from_batches([batch])))
+
+
+    def __arrow_usecols(self, schema: 'pyarrow.Schema') -> Optional[List[str]]:
+        usecols = self.__usecols(schema.names)
+        metadata = schema.metadata or {}
+        if usecols is not None and b'geo' in metadata:
+            geo = json.loads(metadata[b'geo'])
+            usecols += [name for name in geo['columns'] 
+                        if name in schema.names and name not in usecols]
+
+        return usecols
+
+
+    def __arrow_to_gdf(self, table: 'pyarrow.Table') -> gpd.GeoDataFrame:
+        metadata = table.schema.metadata or {}
+        df = table.to_pandas()
+        if any(name is not None for name in df.index.names):
+            df = df.reset_index() # stored indexes are read as columns
+
+        if b'geo' not in metadata: # geometry, if any, is geometrized later
+            return df
+
+        geo = json.loads(metadata[b'geo'])
+        for (name, column) in geo['columns'].items():
+            if name in df.columns:
+                df[name] = self.__decode_geometry(df[name]).set_crs(
+                                column.get('crs', 'OGC:CRS84'))
+
+        primary = geo['primary_column']
+        if primary != 'geometry' and 'geometry' not in df.columns:
+            df = df.rename(columns={primary: 'geometry'})
+            primary = 'geometry'
+
+        return gpd.GeoDataFrame(df, geometry=primary)
+
+
+    def __read_csv(self, filename: str, **kwargs) -> pd.DataFrame:
+        return self.__decode_csv(
+                    filename, 
+                    lambda file, encoding: pd.read_csv(
+                        file, encoding=encoding, low_memory=False, **kwargs))
+
+
+    def __decode_csv(self, 
+                     filename: str, 
+                     read: Callable[[Union[str, IO[bytes]], str], Any]
+                     ) -> Any:
+        """
+        Returns ``read(file, encoding)`` of the opened CSV and its detected
+        encoding, retried with ISO-8859-1 if the detection was wrong.
+
+        """
+        encoding = self.__detect_encoding(filename)
+        try:
+            with self.__open(filename) as file:
+                return read(file, encoding)
+        except UnicodeDecodeError:
+            if self.encoding is not None:
+                raise
+            # Sample missed the offending bytes; ISO-8859-1 decodes anything
+            self.__encodings[filename] = 'ISO-8859-1'
+            with self.__open(filename) as file:
+                return read(file, 'ISO-8859-1')
+
+
+    def __detect_encoding(self, filename: str) -> str:
+        """
+        Given a filename, returns the initialized encoding or else the 
+        encoding chardet detects from samples at the start, middle and end
+        of the file. Samples begin on line boundaries and detections are
+        cached per file. ASCII is widened to UTF-8.
+
+        """
+        if self.encoding is not None:
+            return self.encoding
+        elif filename in self.__encodings:
+            return self.__encodings[filename]
+
+        with self.__open(filename) as file:
+            if isinstance(file, str):
+                with open(file, 'rb') as binary:
+                    sample = self.__sample_bytes(binary, os.path.getsize(file))
+            else: # zip members can't seek cheaply
+                sample = file.read(ENCODING_SAMPLE_SIZE)
+
+        detected = chardet.detect(sample)['encoding']
+        if detected is None or detected.lower() == 'ascii':
+            detected = 'utf-8'
+
+        self.__encodings[filename] = detected
+        return detected
+
+
+    def __sample_bytes(self, file: IO[bytes], size: int) -> bytes:
+        if size <= 3 * ENCODING_SAMPLE_SIZE:
+            return file.read()
+
+        samples = [file.read(ENCODING_SAMPLE_SIZE)]
+        for offset in [size // 2, size - ENCODING_SAMPLE_SIZE]:
+            file.seek(offset)
+            file.readline() # skip to the start of a line
+            samples.append(file.read(ENCODING_SAMPLE_SIZE))
+
+        return b'\n'.join(samples)
+
+
+    def __read_csv_where(self, 
+                         filename: str, 
+                         column: str, 
+                         value: Union[str, List[str]]
+                         ) -> pd.DataFrame:
+        """
+        Reads only the rows of a CSV whose column contains the value(s), 
+        filtering each chunk as it is parsed so that non-matching rows are
+        never held. Dtypes are those of the whole file: if a column's 
+        chunks disagree on strings, the file is read again with it pinned.
+
+        """
+        usecols = self.__usecols(self.__read_csv(filename, nrows=0).columns)
+
+        def read(file, encoding, dtype=None):
+            (found, chunks) = (collections.defaultdict(set), [])
+            for df in pd.read_csv(file, encoding=encoding, usecols=usecols,
+                                  dtype=dtype, chunksize=STREAM_CHUNKSIZE):
+                self.__add_dtypes(found, df)
+                if column in df.columns:
+                    df = df[self.__matches(df[column], value).values]
+                chunks.append(df)
+            return (found, chunks)
+
+        (found, chunks) = self.__decode_csv(filename, read)
+        dtype = self.__unify_dtypes(found)
+        if str in dtype.values(): # chunks were parsed and matched unlike
+            (_, chunks) = self.__decode_csv(
+                                filename, 
+                                lambda file, encoding: read(file, encoding, 
+                                                            dtype))
+
+        return pd.concat(chunks, ignore_index=True)
+
+
+    def __extract_to_inferred_file(
+            self, 
+            df: Union[gpd.GeoDataFrame, pd.DataFrame], 
+            filename: pathlib.Path, 
+            ext: str
+            ) -> NoReturn:
+        has_index = self.column is not None
+
+        if ext == '.csv':
+            df.to_csv(path_or_buf=filename, index=has_index)
+        elif ext == '.parquet' or ext == '.geoparquet':
+            df.to_parquet(filename, index=has_index)
+        elif ext == '.feather' or ext == '.arrow':
+            df.reset_index(drop=not has_index).to_feather(filename)
+        elif ext == '.pkl' or ext == '.bz2' or ext == '.zip' or \
+             ext == '.gzip' or ext == '.xz':
+            df.to_pickle(filename)
+        elif ext == '.xlsx':
+            df.to_excel(filename, index=has_index)
+        elif ext == '.html':
+            df.to_html(buf=filename, index_names=has_index)
+        elif ext == '.json':
+            df.to_json(path_or_buf=filename)
+        elif ext == '.tex':
+            df.to_latex(buf=filename, index=has_index)
+        else:
+            with open(filename, 'w') as out:
+                if ext == '.md':
+                    out.write(df.to_markdown())
+                else:
+                    out.write(df.to_string())
+    
+
+    def __defers_geometry(self, df: pd.DataFrame) -> bool:
+        """
+        Returns whether a table read as a DataFrame is kept as one: if it
+        has no geometry, or geometry held as WKT strings, which is decoded
+        on first spatial use and otherwise written out as read.
+
+        """
+        if isinstance(df, gpd.GeoDataFrame):
+            return False
+        elif 'geometry' not in df.columns:
+            return True
+
+        valid = df['geometry'].notna().values
+        first = valid.argmax() if len(valid) > 0 else 0
+        return not valid.any() or isinstance(df['geometry'].iat[first], str)
+
+
+    def __geometrize_gdf(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        try:
+            geometry = self.__decode_geometry(gdf['geometry'])
+            geometrized = gdf.drop(columns='geometry')
+            return gpd.GeoDataFrame(geometrized, geometry=geometry)
+
+        except:
+            if 'geometry' not in gdf.columns:
+                return gpd.GeoDataFrame(gdf, geometry=gpd.GeoSeries())
+            else: # not geometry after all, e.g. a column of labels
+                return gpd.GeoDataFrame(gdf)
+
+
+    def __decode_geometry(self, series: pd.Series) -> gpd.GeoSeries:
+        """
+        Given a series of WKT strings or WKB bytes, returns a GeoSeries of
+        decoded geometries. Decodes an array at a time rather than a row at
+        a time and splits large series into chunks that are decoded on a
+        thread pool (vectorized shapely releases the GIL).
+
+        """
+        if isinstance(series.dtype, gpd.array.GeometryDtype):
+            raise TypeError("Geometry is already decoded")
+
+        values = series.values
+        sample = series.dropna()
+        if not sample.empty and isinstance(sample.iloc[0], bytes):
+            decode = gpd.array.from_wkb
+        else:
+            decode = gpd.array.from_wkt
+
+        if len(values) <= GEOMETRIZE_CHUNKSIZE:
+            geometry = np.asarray(decode(values))
+        else:
+            chunks = [values[i:i + GEOMETRIZE_CHUNKSIZE] 
+                      for i in range(0, len(values), GEOMETRIZE_CHUNKSIZE)]
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=os.cpu_count()) as executor:
+                decoded = executor.map(
+                        lambda chunk: np.asarray(decode(chunk)), chunks)
+                geometry = np.concatenate(list(decoded))
+
+        return gpd.GeoSeries(geometry, index=series.index)
+
+
+    #===========================================+
+    # Getters and Setters                       |
+    #===========================================+
+
+    @property
+    def infile(self) -> str:
+        """
+        {str} 
+            Name/path of input file of tabular data to read
+        
+        """
+        return self.__infile
+
+    @infile.setter
+    def infile(self, 
+               infile: Optional[Union[str, 
+                                      gpd.GeoDataFrame,
+                                      pd.DataFrame]]) -> NoReturn:
+        if infile is not None and self.__infile is not None:
+            raise Exception("Infile '{}' is already set".format(self.__infile))
+        elif infile is not None and self.lazy and self.__is_path(infile):
+            self.__infile = infile # read on first use
+            self.__pending = True
+        elif infile is not None and self.chunksize is not None and \
+             self.__is_path(infile):
+            try:
+                self.__schema = self.__peek_schema(infile)
+                self.__spatial = 'geometry' in self.__schema
+                self.__infile = infile
+            except Exception as e:
+                raise FileNotFoundError("{} not found. {}".format(infile, e))
+        elif infile is not None:
+            try:
+                (self.__infile, table, filtered) = self.__read_source(
+                        infile, self.__predicate, reproject=False)
+                if not filtered:
+                    self.__predicate = None
+                self.__set_table(table)
+            except Exception as e:
+                if self.__is_path(infile) and \
+                   not isinstance(infile, (str, os.PathLike)):
+                    raise FileNotFoundError(
+                            "{} not found. {}".format(infile, e))
+                try:
+                    self.__infile = None
+                    if isinstance(infile, pd.DataFrame) and \
+                       self.__defers_geometry(infile):
+                        self.__set_table(self.__clip(infile.copy(deep=False)))
+                    else:
+                        self.__set_table(self.__clip(self.__geometrize_gdf(
+                                gpd.GeoDataFrame(infile))))
+
+                except Exception as e:
+                    raise FileNotFoundError(
+                            "{} not found. {}".format(infile, e))
+
+            # Outside the handlers above, so a missing CRS isn't reported as
+            # a missing file
+            table = self.__reproject(self.__table)
+            if table is not self.__table:
+                self.__set_table(table)
+
+
+    @property
+    def outfile(self) -> Optional[pathlib.Path]:
+        """
+        {pathlib.Path | None}
+            Path of output file for writing. Defaults to stdout
 
         """
         return self.__outfile
@@ -681,14 +2961,18 @@ class ExtractTable:
 
     @column.setter
     def column(self, column: Optional[str]) -> NoReturn:
-        if column is not None:
-            try:
-                self.__coldata = self.__table[column]
-            except Exception as e:
-                raise KeyError("Column not found: {}".format(e))
+        self.__result = None
+        if column is not None and self.__pending:
+            self.__column = column # checked when read
+            self.__value = None
+
+        elif column is not None:
+            if self.__schema is None or column not in self.__schema:
+                raise KeyError("Column not found: {}".format(column))
 
             self.__column = column
             self.__value = None
+            self.__positions = None
 
 
     @property
@@ -702,27 +2986,208 @@ class ExtractTable:
 
     @value.setter
     def value(self, value: Optional[Union[str, List[str]]]) -> NoReturn:
-        if value is not None and self.__table is None:
+        self.__result = None
+        if value is not None and self.__table is None and \
+           not self.__is_streamed() and not self.__pending:
             raise KeyError("Cannot set value without specifying tabular data")
 
         elif value is not None and self.column is None:
             raise KeyError("Cannot set value without specifying column")
 
+        elif value is not None and self.__pending:
+            self.__value = value # checked when read
+
+        elif value is not None and self.__is_streamed():
+            self.__value = value # checked for matches when streamed
+
         elif value is not None:
-            try: # value is a singleton
-                self.__extracted = \
-                    self.__table[self.__table[self.column] == value]
-            except: # value is a list
-                self.__extracted = \
-                    self.__table[self.__table[self.column].isin(value)]
-
-            if self.__extracted.empty:
+            table = self.__get_table(self.column, value)
+            self.__extracted = (table, self.__lookup(table, value))
+
+            if len(self.__extracted[1]) == 0:
                 raise KeyError(
                     "Column '{}' has no value '{}'".format(self.column, value))
             else:
                 self.__value = value
 
 
+    @property
+    def chunksize(self) -> Optional[int]:
+        """
+        {int | None}
+            Number of rows to read at a time. Defaults to reading all rows
+
+        """
+        return self.__chunksize
+
+    @chunksize.setter
+    def chunksize(self, chunksize: Optional[int]) -> NoReturn:
+        if chunksize is not None and int(chunksize) < 1:
+            raise ValueError("Chunksize must be a positive integer")
+        elif chunksize is not None:
+            self.__chunksize = int(chunksize)
+        else:
+            self.__chunksize = None
+
+
+    @property
+    def columns(self) -> Optional[List[str]]:
+        """
+        {List[str] | None}
+            Labels of columns to read from the input file. Defaults to all
+
+        """
+        return self.__columns
+
+    @columns.setter
+    def columns(self, columns: Optional[List[str]]) -> NoReturn:
+        if columns is not None and self.__infile is not None and \
+           not self.__pending:
+            raise Exception("Infile '{}' is already read".format(self.__infile))
+        elif columns is not None:
+            self.__columns = list(columns)
+        else:
+            self.__columns = None
+
+
+    @property
+    def encoding(self) -> Optional[str]:
+        """
+        {str | None}
+            Text encoding of the input file. Defaults to detecting it
+
+        """
+        return self.__encoding
+
+    @encoding.setter
+    def encoding(self, encoding: Optional[str]) -> NoReturn:
+        if encoding is not None and self.__infile is not None and \
+           not self.__pending:
+            raise Exception("Infile '{}' is already read".format(self.__infile))
+        else:
+            self.__encoding = encoding
+
+
+
+    @property
+    def cache_dir(self) -> Optional[pathlib.Path]:
+        """
+        {pathlib.Path | None}
+            Directory of cached parsed tables. Defaults to no caching
+
+        """
+        return self.__cache_dir
+
+    @cache_dir.setter
+    def cache_dir(self, cache_dir: Optional[str]) -> NoReturn:
+        if cache_dir is not None:
+            self.__cache_dir = pathlib.Path(cache_dir).expanduser()
+        else:
+            self.__cache_dir = None
+
+
+    @property
+    def bbox(self) -> Optional[Tuple[float, float, float, float]]:
+        """
+        {Tuple[float, float, float, float] | None}
+            Bounding box (minx, miny, maxx, maxy) of rows to read. Defaults
+            to all
+
+        """
+        return self.__bbox
+
+    @bbox.setter
+    def bbox(self, 
+             bbox: Optional[Tuple[float, float, float, float]]) -> NoReturn:
+        if bbox is not None and self.__infile is not None and \
+           not self.__pending:
+            raise Exception("Infile '{}' is already read".format(self.__infile))
+        elif bbox is not None and len(bbox) != 4:
+            raise ValueError("Bounding box must be (minx, miny, maxx, maxy)")
+        elif bbox is not None:
+            self.__bbox = tuple(float(b) for b in bbox)
+        else:
+            self.__bbox = None
+
+
+    @property
+    def mask(self) -> Optional[gpd.GeoSeries]:
+        """
+        {gpd.GeoSeries | None}
+            Geometry of rows to read. Defaults to all
+
+        """
+        return self.__mask
+
+    @mask.setter
+    def mask(self, 
+             mask: Optional[Union[gpd.GeoDataFrame, gpd.GeoSeries, 
+                                  shapely.geometry.base.BaseGeometry]]
+             ) -> NoReturn:
+        if mask is not None and self.__infile is not None and \
+           not self.__pending:
+            raise Exception("Infile '{}' is already read".format(self.__infile))
+        elif isinstance(mask, gpd.GeoDataFrame):
+            self.__mask = mask.geometry
+        elif isinstance(mask, gpd.GeoSeries):
+            self.__mask = mask
+        elif mask is not None:
+            self.__mask = gpd.GeoSeries([mask])
+        else:
+            self.__mask = None
+
+
+    @property
+    def crs(self) -> Optional[pyproj.CRS]:
+        """
+        {pyproj.CRS | None}
+            Coordinate reference system of extracted geometry. Defaults to 
+            the input's, which must be known to reproject from
+
+        """
+        return self.__crs
+
+    @crs.setter
+    def crs(self, crs: Optional[Union[str, int, pyproj.CRS]]) -> NoReturn:
+        if crs is not None:
+            crs = pyproj.CRS.from_user_input(crs)
+            if self.__table is not None: # reprojected once, in place
+                self.__set_table(self.__reproject(self.__table, crs))
+            self.__crs = crs
+        else:
+            self.__crs = None
+
+
+    @property
+    def engine(self) -> Optional[str]:
+        """
+        {str | None}
+            Name of engine with which to read and write files of formats 
+            it handles. Defaults to the preferred engine for each format. 
+            Built-in engines only choose how files are read
+
+        """
+        return self.__engine
+
+    @engine.setter
+    def engine(self, engine: Optional[str]) -> NoReturn:
+        if engine is not None and engine not in ENGINES:
+            raise ValueError("Unknown engine '{}'. Engines: {}".format(
+                                engine, ', '.join(ENGINES)))
+        else:
+            self.__engine = engine
+
+
+    @property
+    def lazy(self) -> bool:
+        """
+        {bool}
+            Whether reading the input file is deferred until data is needed
+
+        """
+        return self.__lazy
+
+
 
 #########################################
 #                                       #
@@ -730,9 +3195,20 @@ class ExtractTable:
 #                                       #
 #########################################
 
-def read_file(filename: str, 
-              column:   Optional[str] = None, 
-              value:    Optional[Union[str, List[str]]] = None):
+def read_file(filename:  str, 
+              column:    Optional[str] = None, 
+              value:     Optional[Union[str, List[str]]] = None,
+              chunksize: Optional[int] = None,
+              columns:   Optional[List[str]] = None,
+              encoding:  Optional[str] = None,
+              cache_dir: Optional[str] = None,
+              lazy:      bool = False,
+              bbox:      Optional[Tuple[float, float, float, float]] = None,
+              mask:      Optional[Union[gpd.GeoDataFrame, gpd.GeoSeries, 
+                                        shapely.geometry.base.BaseGeometry]
+                                  ] = None,
+              crs:       Optional[Union[str, int, pyproj.CRS]] = None,
+              engine:    Optional[str] = None):
     """
     Returns an ExtractTable instance with a specified input filename.
 
@@ -744,6 +3220,28 @@ def read_file(filename: str,
         Label of column to use as index for extracted table.
     value : str | List[str] | None, optional, default = ``None``
         Value(s) of specified column in rows to extract.
+    chunksize : int | None, optional, default = ``None``
+        Number of rows to read at a time. If specified, the file is streamed
+        in chunks rather than read into memory at once.
+    columns : List[str] | None, optional, default = ``None``
+        Labels of columns to read. Other columns are never parsed.
+    encoding : str | None, optional, default = ``None``
+        Text encoding of the file. If None, the encoding is detected.
+    cache_dir : str | None, optional, default = ``None``
+        Directory in which to cache the parsed table for later reads.
+    lazy : bool, optional, default = ``False``
+        If True, the file is not read until data is first needed.
+    bbox : Tuple[float, float, float, float] | None, optional, \
+               default = ``None``
+        Bounding box (minx, miny, maxx, maxy) of rows to read.
+    mask : gpd.GeoDataFrame | gpd.GeoSeries | shapely.geometry \
+               | None, optional, default = ``None``
+        Geometry of rows to read.
+    crs : str | int | pyproj.CRS | None, optional, default = ``None``
+        Coordinate reference system to reproject geometry to.
+    engine : str | None, optional, default = ``None``
+        Name of the engine with which to read and write files. If None, the
+        preferred engine for each format is used.
 
     Returns
     -------
@@ -759,8 +3257,176 @@ def read_file(filename: str,
 
     >>> et4 = extract.read_file('in.csv', column='X', value=['1','3'])
 
+    >>> et5 = extract.read_file('big.csv', chunksize=100000)
+
+    >>> et6 = extract.read_file('in.shp', columns=['GEOID', 'NAME'])
+
+    >>> et7 = extract.read_file('in.shp', cache_dir='~/.cache/gdutils')
+
+    >>> et8 = extract.read_file('in.shp', lazy=True)
+
+    >>> et9 = extract.read_file('in.shp', bbox=(-73.7, 41.0, -72.9, 41.5))
+
+    >>> et10 = extract.read_file('in.shp', crs='EPSG:4326')
+
+    >>> et11 = extract.read_file('big.csv', engine='pyarrow')
+
+    """
+    return ExtractTable(filename, None, column=column, value=value, 
+                        chunksize=chunksize, columns=columns, 
+                        encoding=encoding, cache_dir=cache_dir, lazy=lazy,
+                        bbox=bbox, mask=mask, crs=crs, engine=engine)
+
+
+def clear_cache(cache_dir: str) -> NoReturn:
+    """
+    Removes all cached parsed tables from the given cache directory.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory of cached parsed tables, as given to ``read_file`` or
+        ``ExtractTable``.
+
+    Examples
+    --------
+    >>> extract.clear_cache('~/.cache/gdutils')
+
+    """
+    cache_dir = pathlib.Path(cache_dir).expanduser()
+    for pattern in ['*.parquet', '*.pkl', '*.partial']:
+        for entry in cache_dir.glob(pattern):
+            os.remove(entry)
+
+
+def register_engine(name:         str, 
+                    extensions:   Optional[List[str]],
+                    read:         Optional[Callable[[Union[str, IO[bytes]], 
+                                                     dict], 
+                                                    Union[pd.DataFrame, 
+                                                          Iterator[
+                                                            pd.DataFrame]]]
+                                           ] = None,
+                    write:        Optional[Callable[[pd.DataFrame, 
+                                                     pathlib.Path, bool], 
+                                                    Any]] = None,
+                    capabilities: Optional[List[str]] = None,
+                    preferred:    bool = False) -> NoReturn:
+    """
+    Registers an engine to read and/or write files of the given extensions.
+
+    ``read(file, options)`` is given a local path or binary file object and
+    a dict of the 'columns', 'predicate' ((column, value) filter), 'bbox', 
+    'encoding' and 'chunksize' to read with, and returns a DataFrame. If the
+    engine has the 'streaming' capability and a chunksize is given, it 
+    returns an iterator of DataFrames of at most that many rows instead. 
+    Options the engine lacks the capability for may be ignored, as rows and
+    columns are filtered again once read. Unless an engine is chosen, files
+    are read by the first engine for their extension with every capability
+    the read needs, if one has them. Geometry, if any, is read from a 
+    'geometry' column of WKT, WKB or shapely geometries.
+
+    ``write(df, filename, index)`` writes a DataFrame, or a GeoDataFrame if
+    it has geometry, including its index if `index` is True.
+
+    Parameters
+    ----------
+    name : str
+        Name of the engine, as given to ``ExtractTable`` or ``--engine``. 
+        Replaces an engine registered with the same name.
+    extensions : List[str] | None
+        Extensions of files the engine handles, e.g. ['.csv'], or None for
+        any extension not handled by another engine.
+    read : Callable | None, optional, default = ``None``
+        Function reading a file, or None if the engine can't read.
+    write : Callable | None, optional, default = ``None``
+        Function writing a file, or None if the engine can't write.
+    capabilities : List[str] | None, optional, default = ``None``
+        Capabilities of the reader, of ENGINE_CAPABILITIES.
+    preferred : bool, optional, default = ``False``
+        If True, the engine is preferred over all others for its extensions.
+        Otherwise it is used only if chosen or no other handles them.
+
+    Raises
+    ------
+    ValueError
+        Raised if replacing a built-in engine, if given neither function, or
+        if given unknown capabilities.
+
+    Examples
+    --------
+    >>> def read_psv(file, options):
+    ...     return pd.read_csv(file, sep='|', usecols=options['columns'])
+    >>> extract.register_engine('psv', ['.psv'], read=read_psv, 
+    ...                         capabilities=['projection'])
+    >>> et = extract.read_file('input.psv')
+    # reads 'input.psv' with read_psv
+
+    """
+    if name in BUILTIN_ENGINES:
+        raise ValueError("Cannot replace built-in engine '{}'".format(name))
+    elif read is None and write is None:
+        raise ValueError("Engine '{}' neither reads nor writes".format(name))
+
+    capabilities = list(capabilities or [])
+    unknown = [c for c in capabilities if c not in ENGINE_CAPABILITIES]
+    if unknown:
+        raise ValueError("Unknown capabilities: {}".format(unknown))
+
+    if extensions is not None:
+        extensions = [ext.lower() if ext.startswith('.') else '.' + ext.lower()
+                      for ext in extensions]
+
+    engines = {} if preferred else dict(ENGINES)
+    engines.pop(name, None)
+    engines[name] = Engine(extensions, capabilities, read, write)
+    if preferred:
+        engines.update((n, e) for (n, e) in ENGINES.items() if n != name)
+
+    ENGINES.clear()
+    ENGINES.update(engines)
+
+
+def list_engines(ext: Optional[str] = None) -> List[str]:
+    """
+    Returns the names of registered engines, in order of preference.
+
+    Parameters
+    ----------
+    ext : str | None, optional, default = ``None``
+        Extension of files, e.g. '.csv'. If given, only engines handling it
+        are listed.
+
+    Returns
+    -------
+    List[str]
+        Names of engines.
+
+    Examples
+    --------
+    >>> extract.list_engines('.csv')
+    ['pandas', 'pyarrow', 'fiona']
+
+    """
+    if ext is None:
+        return list(ENGINES)
+
+    ext = ext.lower() if ext.startswith('.') else '.' + ext.lower()
+    return [name for (name, engine) in ENGINES.items() 
+            if engine.extensions is not None and ext in engine.extensions] + \
+           [name for (name, engine) in ENGINES.items() 
+            if engine.extensions is None]
+
+
+@functools.lru_cache(maxsize=64)
+def _get_transformer(source: str, target: str, thread: int
+                     ) -> pyproj.Transformer:
+    """
+    Returns a transformer between two CRSs given as WKT, created once per
+    pair and thread (transformers can't be shared between threads).
+
     """
-    return ExtractTable(filename, None, column=column, value=value)
+    return pyproj.Transformer.from_crs(source, target, always_xy=True)
 
 
 
@@ -779,24 +3445,46 @@ def parse_arguments() -> argparse.Namespace:
     An argparse Namespace object
 
     """
-    infile_help = "name/path of input file of tabular data to read"
+    infile_help = "name/path of input file of tabular data to read; " + \
+                  "given many files or a glob pattern, reads them all"
     column_help = "label of column to use as index for extracted table"
     value_help = "value(s) of specified column in rows to extract"
     outfile_help = "name/path of output file for writing"
+    chunksize_help = "number of rows to read, filter and write at a time"
+    keep_help = "label(s) of columns to read; all others are skipped"
+    encoding_help = "text encoding of input file; detected if not given"
+    cache_dir_help = "directory in which to cache parsed input files " + \
+                     "(default: ${})".format(CACHE_DIR_VARIABLE)
+    no_cache_help = "bypass the parse cache"
+    clear_cache_help = "clear the parse cache before reading"
+    compact_help = "downcast numeric columns and categorize repeated " + \
+                   "strings, reporting memory usage to stderr"
+    to_crs_help = "coordinate reference system to reproject output to, " + \
+                  "e.g. EPSG:4326"
+    bbox_help = "bounding box of rows to read, in the input's coordinates"
+    format_help = "format of output written to stdout (default: " + \
+                  "aligned plaintext)"
+    partition_by_help = "write one outfile per value of column; OUTFILE " + \
+                        "must contain {} where the value is substituted"
+    engine_help = ("engine with which to read and write files of formats " +
+                   "it handles, one of: {} (default: the preferred engine " +
+                   "for each format); built-in engines only choose how " +
+                   "files are read").format(', '.join(ENGINES))
 
     description = """Script to extract tabular data. 
 
-If no outfile is specified, outputs plaintext to stdout. If no column is 
-specified, outputs filetype converted input. If no value is specified, 
-outputs table indexed with given column (required). If value and column 
-are specified, outputs subtable indexed with given column and containing 
-only rows equal to given value(s).
+If no outfile is specified, outputs plaintext to stdout, or streams rows to
+stdout in the given --format. If no column is specified, outputs filetype 
+converted input. If no value is specified, outputs table indexed with given 
+column (required). If value and column are specified, outputs subtable 
+indexed with given column and containing only rows equal to given value(s).
 
 supported input filetypes:
-    .csv .geojson .shp .xlsx .zip
+    .arrow .csv .feather .geojson .geoparquet .parquet .shp .xlsx .zip
 
 supported output filetypes:
-    .bz2 .csv .geojson .gpkg .gzip .html .json .md .pkl .tex .xlsx .zip 
+    .arrow .bz2 .csv .feather .geojson .geojsonl .geojsons .geoparquet .gpkg
+    .gzip .html .json .jsonl .md .ndjson .parquet .pkl .tex .tsv .xlsx .zip 
     all other extensions will contain output in plaintext
 """
     
@@ -804,7 +3492,15 @@ supported output filetypes:
     python extract.py input.xlsx -c ID > output.csv
     python extract.py foo.csv -o bar.csv -c "state fips" -v 01
     python extract.py input.csv -o ../output.csv -c Name -v "Rick Astley"
-    python extract.py in.csv -o out.csv -c NUM -v 0 1 2 3"""
+    python extract.py in.csv -o out.csv -c NUM -v 0 1 2 3
+    python extract.py big.csv -o out.csv -c STATE -v MA --chunksize 100000
+    python extract.py in.shp -o out.csv -c GEOID --keep NAME TOTPOP
+    python extract.py national.shp -o "states/{}.shp" --partition-by STATEFP
+    python extract.py big.csv --chunksize 100000 --format ndjson | head
+    python extract.py "counties/*.csv" -o state.csv -c GEOID
+    python extract.py blocks.shp -o clip.shp --bbox -73.7 41.0 -72.9 41.5
+    python extract.py in.shp -o out.geojson --to-crs EPSG:4326
+    python extract.py big.csv -o out.parquet --engine pyarrow"""
 
     parser = argparse.ArgumentParser(
                 description=description,
@@ -813,6 +3509,7 @@ supported output filetypes:
     parser.add_argument(
                 'infile',
                 metavar='INFILE', 
+                nargs='+',
                 help=infile_help)
     parser.add_argument(
                 '-o', 
@@ -836,6 +3533,77 @@ supported output filetypes:
                 type=str,
                 nargs='+',
                 help=value_help)
+    parser.add_argument(
+                '--chunksize',
+                dest='chunksize',
+                metavar='CHUNKSIZE',
+                type=int,
+                help=chunksize_help)
+    parser.add_argument(
+                '--keep',
+                dest='keep',
+                metavar='COL',
+                type=str,
+                nargs='+',
+                help=keep_help)
+    parser.add_argument(
+                '--encoding',
+                dest='encoding',
+                metavar='ENCODING',
+                type=str,
+                help=encoding_help)
+    parser.add_argument(
+                '--cache-dir',
+                dest='cache_dir',
+                metavar='DIR',
+                type=str,
+                default=os.environ.get(CACHE_DIR_VARIABLE),
+                help=cache_dir_help)
+    parser.add_argument(
+                '--no-cache',
+                dest='no_cache',
+                action='store_true',
+                help=no_cache_help)
+    parser.add_argument(
+                '--clear-cache',
+                dest='clear_cache',
+                action='store_true',
+                help=clear_cache_help)
+    parser.add_argument(
+                '--partition-by',
+                dest='partition_by',
+                metavar='COL',
+                type=str,
+                help=partition_by_help)
+    parser.add_argument(
+                '--format',
+                dest='format',
+                choices=['csv', 'tsv', 'ndjson', 'geojsonseq'],
+                help=format_help)
+    parser.add_argument(
+                '--bbox',
+                dest='bbox',
+                metavar=('MINX', 'MINY', 'MAXX', 'MAXY'),
+                type=float,
+                nargs=4,
+                help=bbox_help)
+    parser.add_argument(
+                '--to-crs',
+                dest='to_crs',
+                metavar='CRS',
+                type=str,
+                help=to_crs_help)
+    parser.add_argument(
+                '--compact',
+                dest='compact',
+                action='store_true',
+                help=compact_help)
+    parser.add_argument(
+                '--engine',
+                dest='engine',
+                metavar='ENGINE',
+                type=str,
+                help=engine_help)
 
     return parser.parse_args()
 
@@ -850,14 +3618,39 @@ supported output filetypes:
 def main() -> NoReturn:
     """Validates input, parses command-line arguments, runs script."""
     args = parse_arguments()
-    infile = args.infile
+    infile = args.infile[0] if len(args.infile) == 1 else args.infile
     outfile = args.outfile
     column = args.column
     value = args.value
+    chunksize = args.chunksize
+    keep = args.keep
+    encoding = args.encoding
+    cache_dir = None if args.no_cache else args.cache_dir
 
     try:
-        et = ExtractTable(infile, outfile, column, value)
-        et.extract_to_file()
+        if args.clear_cache and args.cache_dir is not None:
+            clear_cache(args.cache_dir)
+
+        if args.partition_by is not None and outfile is None:
+            raise ValueError("--partition-by requires an outfile template")
+        if args.partition_by is not None and keep is not None and \
+           args.partition_by not in keep:
+            keep = keep + [args.partition_by]
+
+        et = ExtractTable(infile, outfile, column, value, chunksize, keep,
+                          encoding, cache_dir, bbox=args.bbox, 
+                          crs=args.to_crs, engine=args.engine)
+        if args.compact:
+            (before, after) = et.optimize()
+            print("Memory usage: {:,} -> {:,} bytes".format(before, after),
+                  file=sys.stderr)
+
+        if args.partition_by is not None:
+            et.partition_by(args.partition_by, outfile)
+        else:
+            et.extract_to_file(fmt=args.format)
+    except BrokenPipeError: # e.g. piped into head
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
     except Exception as e:
         print(e)
 
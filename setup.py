@@ -25,7 +25,7 @@ install_dependencies = [
       "pytz            == 2020.*",
       "requests        == 2.*",
       "setuptools      == 49.*",
-      "Shapely         == 1.*",
+      "Shapely         == 2.*",
       "six             == 1.*",
       "toml            == 0.*",
       "urllib3         == 1.*",
@@ -36,6 +36,10 @@ test_dependencies = [
       'pytest'
 ]
 
+optional_dependencies = {
+      'arrow': ["pyarrow"]
+}
+
 setup(name='gdutils',
       version='1.1.1',
       description='A collection of geodata tools',
@@ -44,5 +48,6 @@ setup(name='gdutils',
       license='MIT', 
       packages=['gdutils'],
       install_requires=install_dependencies,
+      extras_require=optional_dependencies,
       tests_requires=test_dependencies,
       test_suite='pytest')
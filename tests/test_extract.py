@@ -2,9 +2,14 @@ import pandas as pd
 import geopandas as gpd
 import numpy as np
 from pathlib import PosixPath
+import json
 import os
+import time
+import zipfile
 
 import pytest
+import shapely.geometry
+import shapely.wkt
 
 import gdutils.extract as et
 
@@ -191,6 +196,53 @@ def test_value():
     extract = test_et.extract()
 
 
+def test_value_lookups(monkeypatch):
+    test_et = et.read_file(zip_inf, 'COUNTYFP10')
+    gdf = pd.DataFrame(et.read_file(zip_inf).extract())
+
+    builds = []
+    factorize = pd.factorize
+    monkeypatch.setattr(pd, 'factorize', 
+                        lambda *args, **kwargs: builds.append(args) or \
+                                                factorize(*args, **kwargs))
+    test_et.value = '001'
+    assert len(builds) == 0 # a single lookup scans the column
+    test_et.value = '003'
+    test_et.value = '009'
+    assert len(builds) == 1
+    expected = list(gdf['COUNTYFP10'].unique())
+    with monkeypatch.context() as m:
+        m.setattr(pd.Series, 'unique', None) # answered by the index
+        assert list(test_et.list_values(unique=True)) == expected
+
+    for value in ['001', '003', ['009', '001'], ['001', '001'], '015']:
+        test_et.value = value
+        if isinstance(value, list):
+            expected = gdf[gdf['COUNTYFP10'].isin(value)]
+        else:
+            expected = gdf[gdf['COUNTYFP10'] == value]
+        assert test_et.extract().equals(
+                    gpd.GeoDataFrame(expected.set_index('COUNTYFP10')))
+
+    with pytest.raises(Exception):
+        test_et.value = bad_val
+    with pytest.raises(Exception):
+        test_et.value = 1
+
+    assert (test_et.list_values(unique=True) == 
+                gdf['COUNTYFP10'].unique()).all()
+
+    test_et.column = 'NAME10'
+    test_et.value = gdf['NAME10'].iloc[0]
+    assert (test_et.extract().index == gdf['NAME10'].iloc[0]).all()
+
+    test_et = et.ExtractTable(zip_inf, None, 'COUNTYFP10', '003')
+    expected = test_et.extract()
+    assert len(test_et.list_values('NAME10')) == len(gdf) # re-reads table
+    assert test_et.extract().equals(expected)
+    assert test_et.extract() is not test_et.extract()
+
+
 def test_outfile():
     test_et = et.ExtractTable(good_inf1)
 
@@ -277,6 +329,77 @@ def test_read_file():
     assert test_et.value == good_val2
 
 
+def test_read_flat_file(tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("GeoDataFrame built for a table without geometry")
+
+    monkeypatch.setattr(gpd.GeoDataFrame, "__init__", fail)
+    test_et = et.ExtractTable(good_inf1, column=good_col1a, value=good_val1a)
+    outfile = tmp_path / "flat.csv"
+    test_et.extract_to_file(outfile)
+    streamed = et.ExtractTable(good_inf1, column=good_col1a, 
+                               value=good_val1a, chunksize=2)
+    streamed.extract_to_file(tmp_path / "streamed.csv")
+    monkeypatch.undo()
+
+    df = pd.read_csv(good_inf1)
+    written = pd.read_csv(outfile)
+    assert list(written.columns) == [good_col1a, 'Unnamed: 0', good_col1b]
+    assert len(written) == (df[good_col1a] == good_val1a).sum()
+    assert written.equals(pd.read_csv(tmp_path / "streamed.csv"))
+    assert all(type(chunk) == gpd.GeoDataFrame 
+               for chunk in streamed.iter_chunks())
+
+    extract = test_et.extract()
+    assert type(extract) == gpd.GeoDataFrame
+    assert extract.geometry.isna().all()
+
+
+def test_deferred_geometry(tmp_path, monkeypatch, capsys):
+    def fail(*args, **kwargs):
+        raise AssertionError("geometry decoded")
+
+    monkeypatch.setattr(gpd.array, "from_wkt", fail)
+    test_et = et.ExtractTable(good_inf2, column=good_col2, value=good_val2)
+    outfile = tmp_path / "wkt.csv"
+    test_et.extract_to_file(outfile)
+    test_et.extract_to_file(fmt='ndjson')
+    monkeypatch.undo()
+
+    decoded = []
+    from_wkt = gpd.array.from_wkt
+    monkeypatch.setattr(gpd.array, "from_wkt", 
+                        lambda *args, **kwargs: decoded.append(args) or \
+                                                from_wkt(*args, **kwargs))
+    streamed = et.ExtractTable(good_inf2, column=good_col2, value=good_val2,
+                               chunksize=2)
+    streamed.extract_to_file(tmp_path / "streamed.csv")
+    assert len(decoded) == 0
+    monkeypatch.undo()
+    assert pd.read_csv(outfile).equals(pd.read_csv(tmp_path / "streamed.csv"))
+
+    df = pd.read_csv(good_inf2)
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)['geometry'] for line in lines] == \
+                list(df[df[good_col2] == good_val2]['geometry'])
+    written = pd.read_csv(outfile)
+    assert (written['geometry'].values ==
+            df[df[good_col2] == good_val2]['geometry'].values).all()
+
+    extract = test_et.extract()
+    assert isinstance(extract.geometry.values, gpd.array.GeometryArray)
+    assert not extract.geometry.isna().any()
+    assert len(test_et.extract_where(shapely.geometry.box(-180, -90,
+                                                          180, 90))) > 0
+
+    infile = tmp_path / "labels.csv"
+    infile.write_text('a,geometry\n1,foo\n2,bar\n')
+    for test_et in [et.read_file(str(infile)), et.read_file(str(infile), 'a')]:
+        extract = test_et.extract()
+        assert type(extract) == gpd.GeoDataFrame
+        assert list(extract['geometry']) == ['foo', 'bar']
+
+
 def test_list_columns():
     test_et = et.ExtractTable()
     
@@ -294,6 +417,24 @@ def test_list_columns():
     assert (cols == np.array(full_cols2, dtype=object)).all()
 
 
+def test_cached_metadata(monkeypatch):
+    test_et = et.read_file(good_inf1)
+    cols = test_et.list_columns()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("geometry column rescanned")
+
+    monkeypatch.setattr(gpd.GeoSeries, "isna", fail)
+    assert (test_et.list_columns() == cols).all()
+    test_et.column = good_col1a
+    with pytest.raises(KeyError):
+        test_et.column = "NOT_A_COLUMN"
+
+    monkeypatch.undo()
+    test_et.optimize()
+    assert (test_et.list_columns() == cols).all()
+
+
 def test_list_values():
     test_et = et.ExtractTable()
 
@@ -354,6 +495,28 @@ def test_extract():
     assert extract.equals(gdf1)
 
 
+def test_extract_memoized():
+    test_et = et.ExtractTable(good_inf1, column=good_col1a, value=good_val1a)
+
+    cached = test_et.extract(copy=False)
+    assert test_et.extract(copy=False) is cached
+    extract = test_et.extract()
+    assert extract is not cached
+    assert extract.equals(cached)
+
+    extract['col2'] = 'modified'
+    assert not test_et.extract(copy=False).equals(extract)
+
+    test_et.value = good_vals1a
+    extract = test_et.extract(copy=False)
+    assert extract is not cached
+    assert set(extract.index) == set(good_vals1a)
+
+    test_et.column = good_col1b
+    assert extract.index.name == good_col1a
+    assert test_et.extract(copy=False).index.name == good_col1b
+
+
 def test_extract_to_file():
     del_outs()
 
@@ -392,6 +555,717 @@ def test_value_dtype_preservation():
                     gpd_gdf1.columns, et_gdf1.columns)))
 
 
+def test_predicate_pushdown(tmp_path, monkeypatch):
+    test_et = et.ExtractTable(good_inf1)
+    test_et.column = good_col1a
+    test_et.value = good_vals1a
+    expected = test_et.extract()
+
+    test_et = et.ExtractTable(good_inf1, None, good_col1a, good_vals1a)
+    assert test_et.extract().equals(expected)
+    assert (test_et.list_values() == np.array(full_vals1)).all()
+
+    test_et = et.ExtractTable(good_inf1, None, good_col1b, good_val1b)
+    assert list(test_et.extract()[good_col1a]) == ['c']
+    test_et.value = 'b'
+    assert list(test_et.extract()[good_col1a]) == ['a']
+
+    test_et = et.ExtractTable(zip_inf)
+    test_et.column = 'COUNTYFP10'
+    test_et.value = ['001', '003']
+    expected = test_et.extract()
+
+    test_et = et.ExtractTable(zip_inf, None, 'COUNTYFP10', ['001', '003'])
+    assert test_et.extract().equals(expected)
+    test_et.column = 'COUNTYFP10'
+    assert len(test_et.extract()) == len(et.read_file(zip_inf).extract())
+
+    with pytest.raises(Exception):
+        test_et = et.ExtractTable(zip_inf, None, 'COUNTYFP10', bad_val)
+    with pytest.raises(Exception):
+        test_et = et.ExtractTable(zip_inf, None, bad_col, '001')
+
+    infile = tmp_path / "records.csv"
+    infile.write_text('id,st,note\n1,MA,a\n\n2,NY,b\n3,MA,"x\ny"\n'
+                      '4,MA,c\n5,CT,"p\nq"\n')
+    for value in ['MA', 'CT']:
+        test_et = et.ExtractTable(str(infile))
+        test_et.column = 'st'
+        test_et.value = value
+        expected = test_et.extract()
+        test_et = et.ExtractTable(str(infile), None, 'st', value)
+        assert test_et.extract().equals(expected)
+    assert list(test_et.extract()['note']) == ['p\nq']
+    test_et.value = 'MA'
+    assert list(test_et.extract()['id']) == [1, 3, 4]
+
+    infile = tmp_path / "codes.csv"
+    infile.write_text('STATE,CODE,n\nMA,01,1\nMA,02,2\nNY,A3,\n'
+                      '25,04,4\nMA,05,5\n')
+    monkeypatch.setattr(et, 'STREAM_CHUNKSIZE', 2)
+    for value in ['MA', '25']:
+        test_et = et.ExtractTable(str(infile))
+        test_et.column = 'STATE'
+        test_et.value = value
+        expected = test_et.extract()
+        extract = et.ExtractTable(str(infile), None, 'STATE', value).extract()
+        assert extract.equals(expected)
+        assert (extract.dtypes == expected.dtypes).all()
+    assert list(extract['CODE']) == ['04']
+
+
+def test_lazy():
+    test_et = et.ExtractTable(bad_inf, lazy=True)
+    assert test_et.infile == bad_inf
+    with pytest.raises(FileNotFoundError):
+        test_et.extract()
+    assert test_et.infile == bad_inf
+    with pytest.raises(FileNotFoundError):
+        test_et.extract()
+
+    test_et = et.ExtractTable(good_inf1, good_out, lazy=True)
+    test_et.column = bad_col
+    with pytest.raises(KeyError):
+        test_et.extract()
+    assert test_et.column == bad_col
+    test_et.column = good_col1a
+    assert (test_et.list_values() == np.array(full_vals1)).all()
+
+    test_et = et.ExtractTable(zip_inf, columns=['NAME10'], lazy=True)
+    test_et.column = 'COUNTYFP10'
+    test_et.value = ['001', '003']
+    expected = et.ExtractTable(zip_inf, None, 'COUNTYFP10', ['001', '003'],
+                               columns=['NAME10']).extract()
+    assert test_et.extract().equals(expected)
+    assert list(test_et.list_columns()) == ['COUNTYFP10', 'NAME10', 
+                                            'geometry']
+    test_et.value = '005'
+    assert (test_et.extract().index == '005').all()
+
+    test_et = et.read_file(good_inf1, good_col1a, lazy=True)
+    test_et.value = bad_val
+    with pytest.raises(KeyError):
+        test_et.extract_to_file()
+
+
+def test_columns():
+    test_et = et.ExtractTable(good_inf1, columns=[good_col1b])
+    assert test_et.columns == [good_col1b]
+    assert (test_et.list_columns() == np.array([good_col1b])).all()
+
+    test_et = et.read_file(good_inf1, good_col1a, good_val1a, 
+                           columns=[good_col1b])
+    assert list(test_et.extract().columns) == [good_col1b, 'geometry']
+    assert list(test_et.extract()[good_col1b]) == ['d', '3', '5']
+
+    test_et = et.read_file(good_inf2, columns=[good_col2])
+    assert list(test_et.extract().columns) == [good_col2, 'geometry']
+
+    test_et = et.ExtractTable(zip_inf, columns=['NAME10'], chunksize=500)
+    assert list(test_et.extract().columns) == ['NAME10', 'geometry']
+
+    test_et = et.ExtractTable(zip_inf, None, 'COUNTYFP10', '001', 
+                              columns=['NAME10'])
+    assert test_et.columns == ['NAME10', 'COUNTYFP10']
+    assert list(test_et.extract().columns) == ['NAME10', 'geometry']
+
+    with pytest.raises(Exception):
+        test_et = et.ExtractTable(good_inf1, columns=[bad_col])
+    with pytest.raises(Exception):
+        test_et = et.ExtractTable(zip_inf, columns=[bad_col])
+    with pytest.raises(Exception):
+        test_et.columns = [good_col1a]
+
+
+def test_read_zip(tmp_path):
+    outer = str(tmp_path / 'outer.zip')
+    with zipfile.ZipFile(outer, 'w') as zipped:
+        zipped.write(zip_inf, 'nested/CT_precincts.zip')
+        zipped.write(good_inf1, 'test1.csv')
+        zipped.write(good_inf1, '.hidden.shp')
+    nested = str(tmp_path / 'nested.zip')
+    with zipfile.ZipFile(nested, 'w') as zipped:
+        zipped.write(zip_inf, 'CT_precincts.zip')
+    contents = sorted(os.listdir(tmp_path))
+
+    test_et = et.read_file(outer)
+    assert test_et.infile == outer
+    assert (test_et.list_columns() == np.array(full_cols1)).all()
+
+    test_et = et.read_file(outer, good_col1a, good_val1a, chunksize=2)
+    assert list(test_et.extract()[good_col1b]) == ['d', '3', '5']
+
+    test_et = et.read_file(nested, 'COUNTYFP10', '001')
+    assert (test_et.extract().index == '001').all()
+
+    test_et = et.read_file(zip_inf)
+    assert len(test_et.extract()) == 739
+    assert not os.path.exists('tests/inputs/CT_precincts')
+    assert sorted(os.listdir(tmp_path)) == contents
+
+
+def test_encoding(tmp_path, monkeypatch):
+    latin1 = str(tmp_path / 'latin1.csv')
+    with open(latin1, 'wb') as f:
+        f.write(b'name,num\n' + b'ascii,1\n' * 50000)
+        f.write('Montr\u00e9al,2\n'.encode('ISO-8859-1'))
+
+    reads = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(pd, 'read_csv', 
+                        lambda *args, **kwargs: reads.append(kwargs) or \
+                                                read_csv(*args, **kwargs))
+
+    test_et = et.read_file(latin1, 'num', 2)
+    assert list(test_et.extract()['name']) == ['Montr\u00e9al']
+    test_et = et.read_file(latin1)
+    assert test_et.list_values('name')[-1] == 'Montr\u00e9al'
+    assert len(reads) == 3 # header, matches, full read
+
+    test_et = et.read_file(latin1, encoding='cp1252', chunksize=10000)
+    assert test_et.encoding == 'cp1252'
+    assert test_et.list_values('name')[-1] == 'Montr\u00e9al'
+
+    with pytest.raises(Exception):
+        test_et.encoding = 'utf-8'
+
+
+def test_arrow_formats(tmp_path):
+    for ext in ['.parquet', '.geoparquet', '.feather', '.arrow']:
+        outfile = str(tmp_path / ('geo' + ext))
+        test_et = et.ExtractTable(zip_inf, outfile, 'COUNTYFP10', '001')
+        test_et.extract_to_file()
+        gdf = test_et.extract()
+
+        extract = et.read_file(outfile, 'COUNTYFP10').extract()
+        assert type(extract) == gpd.GeoDataFrame
+        assert extract.crs == gdf.crs
+        assert extract.geometry.geom_equals(gdf.geometry).all()
+
+        extract = et.read_file(outfile, columns=['NAME10']).extract()
+        assert list(extract.columns) == ['NAME10', 'geometry']
+
+        outfile = str(tmp_path / ('plain' + ext))
+        et.ExtractTable(good_inf1, outfile).extract_to_file()
+        extract = et.read_file(outfile).extract()
+        assert list(extract.columns) == full_cols1 + ['geometry']
+        assert (et.read_file(outfile).list_values(good_col1a) 
+                    == np.array(full_vals1)).all()
+
+    test_et = et.ExtractTable(str(tmp_path / 'geo.parquet'), None, 'NAME10', 
+                              chunksize=50)
+    assert len(list(test_et.iter_chunks())) == 4
+    assert test_et.extract().crs == gdf.crs
+
+
+def test_engines(tmp_path, monkeypatch):
+    assert et.list_engines('.csv')[0] == 'pandas'
+    assert et.list_engines('.shp') == ['fiona']
+    with pytest.raises(Exception):
+        et.ExtractTable(good_inf1, engine='not_an_engine')
+    with pytest.raises(ValueError):
+        et.register_engine('pandas', ['.csv'], read=pd.read_csv)
+
+    extract = et.ExtractTable(good_inf1, engine='pyarrow').extract()
+    assert extract.equals(et.ExtractTable(good_inf1).extract())
+
+    def read_psv(file, options):
+        if options['chunksize'] is None:
+            return pd.read_csv(file, sep='|')
+        return pd.read_csv(file, sep='|', chunksize=options['chunksize'])
+
+    def write_psv(df, filename, index):
+        df.to_csv(filename, sep='|', index=index)
+
+    monkeypatch.setattr(et, 'ENGINES', dict(et.ENGINES))
+    et.register_engine('psv', ['.psv'], read_psv, write_psv, ['streaming'])
+    assert et.list_engines('psv') == ['psv', 'fiona']
+
+    outfile = tmp_path / 'out.psv'
+    et.ExtractTable(good_inf1, outfile, good_col1a).extract_to_file()
+    assert open(outfile).readline().strip() == \
+                '|'.join([good_col1a, 'Unnamed: 0', good_col1b])
+
+    test_et = et.ExtractTable(str(outfile), column=good_col1a,
+                              value=good_val1a)
+    assert list(test_et.extract()[good_col1b]) == ['d', '3', '5']
+    test_et = et.ExtractTable(str(outfile), chunksize=2)
+    assert [len(chunk) for chunk in test_et.iter_chunks()] == [2, 2, 1]
+
+    reads = []
+    def read_psv_where(file, options):
+        reads.append(options['predicate'])
+        (column, value) = options['predicate'] or (None, None)
+        df = read_psv(file, options)
+        return df if column is None else df[df[column] == value]
+
+    et.register_engine('psv_where', ['.psv'], read_psv_where, 
+                       capabilities=['pushdown'])
+    test_et = et.ExtractTable(str(outfile), column=good_col1a,
+                              value=good_val1a)
+    assert reads == [(good_col1a, good_val1a)] # the engine able to filter
+    assert list(test_et.extract()[good_col1b]) == ['d', '3', '5']
+    et.ExtractTable(str(outfile))
+    assert len(reads) == 1
+
+    test_et = et.ExtractTable(str(outfile), engine='psv_where')
+    with pytest.raises(RuntimeError, match="can't write"):
+        test_et.extract_to_file(tmp_path / 'out2.psv')
+
+
+def test_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / 'cache'
+    csv = str(tmp_path / 'test1.csv')
+    with open(good_inf1) as src, open(csv, 'w') as dst:
+        dst.write(src.read())
+
+    expected = et.read_file(csv).extract()
+    test_et = et.read_file(csv, cache_dir=str(cache_dir))
+    assert test_et.extract().equals(expected)
+    assert len(os.listdir(cache_dir)) == 1
+
+    monkeypatch.setattr(pd, 'read_csv', None)
+    test_et = et.read_file(csv, cache_dir=str(cache_dir))
+    assert test_et.infile == csv
+    assert test_et.extract().equals(expected)
+    monkeypatch.undo()
+
+    test_et = et.read_file(csv, good_col1a, good_val1a, 
+                           cache_dir=str(cache_dir))
+    assert len(os.listdir(cache_dir)) == 2
+    os.utime(csv, ns=(0, 0))
+    test_et = et.read_file(csv, cache_dir=str(cache_dir))
+    assert len(os.listdir(cache_dir)) == 3
+
+    monkeypatch.setattr(et, 'CACHE_SIZE_LIMIT', 0)
+    test_et = et.read_file(zip_inf, cache_dir=str(cache_dir))
+    assert len(os.listdir(cache_dir)) == 1
+    assert test_et.extract().crs is not None
+
+    et.clear_cache(str(cache_dir))
+    assert len(os.listdir(cache_dir)) == 0
+
+
+def test_iter_chunks():
+    test_et = et.ExtractTable(good_inf1)
+    chunks = list(test_et.iter_chunks(2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert pd.concat(chunks).equals(test_et.extract())
+
+    test_et = et.ExtractTable(good_inf1, column=good_col1a, 
+                              value=good_val1a, chunksize=2)
+    assert test_et.column == good_col1a
+    assert test_et.value == good_val1a
+    chunks = list(test_et.iter_chunks())
+    assert [len(chunk) for chunk in chunks] == [1, 2]
+    assert pd.concat(chunks).equals(
+                et.read_file(good_inf1, good_col1a, good_val1a).extract())
+
+    assert (test_et.list_columns() == np.array(full_cols1)).all()
+    assert (test_et.list_values() == np.array(full_vals1)).all()
+    assert set(test_et.list_values(unique=True)) == set(full_vals1)
+
+    with pytest.raises(Exception):
+        test_et.column = bad_col
+    with pytest.raises(Exception):
+        test_et.value = bad_val
+        test_et.extract()
+
+    test_et = et.ExtractTable(zip_inf, column='COUNTYFP10', value='001',
+                              chunksize=100)
+    extract = test_et.extract()
+    assert type(extract) == gpd.GeoDataFrame
+    assert extract.crs is not None
+    assert (extract.index == '001').all()
+
+
+def test_iter_chunks_dtypes(tmp_path, monkeypatch):
+    infile = tmp_path / "mixed.csv"
+    infile.write_text("fips,x,v\n" + 
+                      "".join("{},{},{}\n".format(i % 5, i, i) 
+                              for i in range(10)) +
+                      "0A,1.5,10\n1,2,100\n")
+
+    whole = et.ExtractTable(str(infile), column='fips', value='1').extract()
+    test_et = et.ExtractTable(str(infile), column='fips', value='1', 
+                              chunksize=5)
+    chunks = list(test_et.iter_chunks())
+    assert list(pd.concat(chunks)['v']) == list(whole['v']) == [1, 6, 100]
+    assert all(chunk['x'].dtype == np.float64 for chunk in chunks)
+
+    reads = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(pd, 'read_csv', 
+                        lambda *args, **kwargs: reads.append(kwargs) or \
+                                                read_csv(*args, **kwargs))
+    test_et = et.ExtractTable(str(infile), chunksize=5)
+    assert [r.get('nrows') for r in reads] == [0] # header only
+    assert test_et.extract().equals(test_et.extract())
+    passes = [r for r in reads if r.get('nrows') != 0]
+    assert len(passes) == 3 # dtypes once, then chunks twice
+
+    infile = tmp_path / "empty.csv"
+    infile.write_text("a,b\n")
+    extract = et.ExtractTable(str(infile), column='a', chunksize=5).extract()
+    assert extract.empty and list(extract.columns) == ['b', 'geometry']
+
+    infile = tmp_path / "null_first.csv"
+    infile.write_text('a,geometry\n1,\n2,POINT (1 2)\n')
+    et.ExtractTable(str(infile), chunksize=1).extract_to_file(
+            tmp_path / 'out.csv')
+    assert list(pd.read_csv(tmp_path / 'out.csv').columns) == \
+                ['a', 'geometry']
+
+
+def test_extract_chunks_to_file():
+    del_outs()
+
+    test_et = et.ExtractTable(good_inf1, dne_out + '.csv', good_col1a, 
+                              good_vals1a, chunksize=2)
+    test_et.extract_to_file()
+    extract = pd.read_csv(dne_out + '.csv')
+    assert list(extract.columns) == ['col1', 'Unnamed: 0', 'col2']
+    assert list(extract[good_col1a]) == ['a', 'c', 'c', 'c']
+
+    del_outfile(dne_out + '.csv')
+    del_outs()
+
+
+def test_multiple_files(tmp_path):
+    gdf = et.read_file(zip_inf).extract()
+    for county in ['001', '003']:
+        part = gdf[gdf['COUNTYFP10'] == county]
+        if county == '003':
+            part = part.to_crs('EPSG:4326')
+        part.to_file(tmp_path / 'ct_{}.shp'.format(county))
+    for name in ['a', 'b']:
+        pd.read_csv(good_inf1).to_csv(tmp_path / '{}.csv'.format(name), 
+                                      index=False)
+
+    test_et = et.ExtractTable(str(tmp_path / 'ct_*.shp'), None, 'NAME10', 
+                              columns=['COUNTYFP10'])
+    extract = test_et.extract()
+    assert list(extract.columns) == ['COUNTYFP10', 'geometry', 
+                                     'source_file']
+    assert len(extract) == gdf['COUNTYFP10'].isin(['001', '003']).sum()
+    assert extract.crs == gdf.crs
+    assert set(extract['source_file']) == {
+                str(tmp_path / 'ct_001.shp'), str(tmp_path / 'ct_003.shp')}
+
+    test_et.value = gdf.loc[gdf['COUNTYFP10'] == '003', 'NAME10'].iloc[0]
+    assert (test_et.extract()['COUNTYFP10'] == '003').all()
+
+    files = [tmp_path / 'a.csv', tmp_path / 'b.csv']
+    test_et = et.ExtractTable(files, None, good_col1a, 'c')
+    extract = test_et.extract()
+    assert list(extract['source_file']) == [str(files[0])] * 3 + \
+                                           [str(files[1])] * 3
+    test_et.value = 'a'
+    assert len(test_et.extract()) == 2
+
+    test_et = et.ExtractTable(str(tmp_path / '*.csv'), None, good_col1a, 
+                              'c', chunksize=2)
+    assert len(test_et.extract()) == 6
+
+    (tmp_path / 'mixed').mkdir()
+    pd.read_csv(good_inf1).to_csv(tmp_path / 'mixed' / 'x.csv', index=False)
+    pd.read_csv(good_inf1).drop(columns=good_col1a).to_csv(
+                    tmp_path / 'mixed' / 'y.csv', index=False)
+    test_et = et.ExtractTable(str(tmp_path / 'mixed' / '*.csv'), None,
+                              good_col1a, 'c')
+    assert len(test_et.extract()) == 3
+    test_et.value = 'b'
+    assert len(test_et.extract()) == 1
+    assert len(test_et.list_values('col2')) == 10
+
+    with pytest.raises(Exception):
+        et.ExtractTable(str(tmp_path / '*.dne'))
+    with pytest.raises(Exception):
+        et.ExtractTable([bad_inf, good_inf1])
+
+
+def test_spatial_filters(tmp_path):
+    gdf = et.read_file(zip_inf).extract()
+    (minx, miny, maxx, maxy) = gdf.total_bounds
+    bbox = (minx, miny, (minx + maxx) / 2, (miny + maxy) / 2)
+    in_bbox = gdf[gdf.intersects(shapely.geometry.box(*bbox))]
+    mask = gdf.iloc[:3]
+    in_mask = gdf[gdf.intersects(mask.unary_union)]
+    assert 0 < len(in_mask) < len(in_bbox) < len(gdf)
+
+    assert len(et.read_file(zip_inf, bbox=bbox).extract()) == len(in_bbox)
+    assert len(et.read_file(zip_inf, mask=mask).extract()) == len(in_mask)
+    assert len(et.ExtractTable(zip_inf, chunksize=100, 
+                               bbox=bbox).extract()) == len(in_bbox)
+    assert len(et.ExtractTable(gdf, mask=mask.unary_union).extract()) == \
+                len(in_mask)
+
+    gdf.to_parquet(tmp_path / 'ct.parquet')
+    extract = et.read_file(tmp_path / 'ct.parquet', 'NAME10', bbox=bbox, 
+                           mask=mask).extract()
+    assert list(extract.index) == list(in_mask.loc[
+                in_mask.intersects(shapely.geometry.box(*bbox)), 'NAME10'])
+
+    test_et = et.read_file(zip_inf)
+    with pytest.raises(Exception):
+        test_et.bbox = bbox
+    with pytest.raises(Exception):
+        et.read_file(zip_inf, bbox=(0, 0, 1))
+
+
+def test_extract_where():
+    gdf = et.read_file(zip_inf).extract()
+    query = gdf.iloc[[5, 100]].buffer(3000)
+
+    test_et = et.read_file(zip_inf, 'NAME10')
+    streamed = et.ExtractTable(zip_inf, None, 'NAME10', chunksize=100)
+    for predicate in ['intersects', 'within', 'contains']:
+        matches = getattr(gdf, predicate)
+        expected = gdf[matches(query.iloc[0]) | matches(query.iloc[1])]
+        extract = test_et.extract_where(query, predicate)
+        assert list(extract.index) == list(expected['NAME10'])
+        extract = streamed.extract_where(query, predicate)
+        assert list(extract.index) == list(expected['NAME10'])
+
+    within = test_et.extract_where(query, 'within')
+    assert len(within) > 0
+    assert test_et.extract_where(list(query), 'within').equals(within)
+    assert len(et.ExtractTable(zip_inf, None, 'NAME10', chunksize=100)
+                 .extract_where(query.to_crs('EPSG:4326'), 'within')) == \
+                len(within)
+
+    test_et.value = list(within.index[:1])
+    assert list(test_et.extract_where(query.iloc[0]).index) == \
+                list(within.index[:1])
+
+    with pytest.raises(ValueError):
+        test_et.extract_where(query, 'near')
+    with pytest.raises(ValueError):
+        et.read_file(good_inf1).extract_where(query)
+
+
+def test_crs(tmp_path):
+    gdf = et.read_file(zip_inf, 'NAME10').extract()
+    expected = gdf.to_crs('EPSG:4326')
+
+    extract = et.read_file(zip_inf, 'NAME10', crs='EPSG:4326').extract()
+    assert extract.crs == 'EPSG:4326'
+    assert extract.geometry.geom_equals_exact(expected.geometry, 1e-9).all()
+    extract = et.ExtractTable(zip_inf, None, 'NAME10', chunksize=200, 
+                              crs=4326).extract()
+    assert extract.geometry.geom_equals_exact(expected.geometry, 1e-9).all()
+
+    test_et = et.read_file(zip_inf, 'NAME10')
+    test_et.extract_to_file(tmp_path / 'out.gpkg', crs='EPSG:4326')
+    assert gpd.read_file(tmp_path / 'out.gpkg').crs == 'EPSG:4326'
+    assert test_et.extract().crs == gdf.crs
+    test_et.crs = 'EPSG:4326'
+    assert test_et.extract().crs == 'EPSG:4326'
+    test_et.crs = gdf.crs
+    assert test_et.extract().geometry.geom_equals_exact(
+                gdf.geometry, 1e-6).all()
+
+    assert et.read_file(good_inf1, crs=4326).extract().equals(
+                et.read_file(good_inf1).extract())
+    with pytest.raises(Exception):
+        et.read_file(zip_inf, crs='not a crs')
+
+    # WKT read from a CSV has no CRS to reproject from
+    with pytest.raises(AttributeError, match='has no CRS'):
+        et.read_file(good_inf2, crs='EPSG:3857')
+    test_et = et.read_file(good_inf2)
+    with pytest.raises(ValueError):
+        test_et.crs = 'EPSG:3857'
+    assert test_et.crs is None
+    with pytest.raises(ValueError):
+        test_et.extract_to_file(tmp_path / 'out.csv', crs='EPSG:3857')
+
+
+def test_stream_formats(tmp_path):
+    gdf = et.read_file(zip_inf, 'NAME10').extract()
+    test_et = et.ExtractTable(zip_inf, None, 'NAME10', chunksize=300,
+                              columns=['COUNTYFP10'])
+
+    test_et.extract_to_file(tmp_path / 'out.geojsonl')
+    extract = gpd.read_file(tmp_path / 'out.geojsonl')
+    assert list(extract.columns) == ['NAME10', 'COUNTYFP10', 'geometry']
+    assert list(extract['NAME10']) == list(gdf.index)
+    assert extract.geometry.geom_equals_exact(
+                gdf.geometry.to_crs('EPSG:4326').reset_index(drop=True),
+                1e-6).all()
+
+    test_et.extract_to_file(tmp_path / 'out.ndjson')
+    extract = pd.read_json(tmp_path / 'out.ndjson', lines=True, 
+                           dtype={'COUNTYFP10': str})
+    assert list(extract['NAME10']) == list(gdf.index)
+    assert list(extract['COUNTYFP10']) == list(gdf['COUNTYFP10'])
+    assert list(extract['geometry']) == list(gdf.geometry.to_wkt())
+
+    test_et = et.read_file(good_inf1, good_col1a)
+    test_et.extract_to_file(tmp_path / 'out.tsv')
+    extract = pd.read_csv(tmp_path / 'out.tsv', sep='\t')
+    assert list(extract.columns) == ['col1', 'Unnamed: 0', 'col2']
+    test_et.extract_to_file(tmp_path / 'out.jsonl')
+    assert list(pd.read_json(tmp_path / 'out.jsonl', lines=True)['col1']) \
+                == ['a', 'c', 'c', 'c', 'b']
+
+
+def test_stdout_formats(capsys, tmp_path, monkeypatch):
+    test_et = et.ExtractTable(good_inf1, None, good_col1a, good_vals1a, 
+                              chunksize=2)
+    test_et.extract_to_file(fmt='csv')
+    assert capsys.readouterr().out.splitlines() == [
+                'col1,Unnamed: 0,col2', 'a,asdf,b', 'c,fdsa,d', 'c,lkjh,3', 
+                'c,oijd,5']
+
+    test_et = et.read_file(good_inf1)
+    test_et.extract_to_file(fmt='ndjson')
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 5
+    assert json.loads(lines[0]) == {'Unnamed: 0': 'asdf', 'col1': 'a', 
+                                    'col2': 'b'}
+
+    test_et = et.read_file(zip_inf, 'NAME10', ['Bethel 1', 'Bethel 2'])
+    test_et.extract_to_file(fmt='geojsonseq')
+    features = [json.loads(line) 
+                for line in capsys.readouterr().out.splitlines()]
+    assert [f['properties']['NAME10'] for f in features] == \
+                ['Bethel 1', 'Bethel 2']
+
+    infile = tmp_path / 'null_first.csv'
+    infile.write_text('a,geometry\n1,\n2,POINT (1 2)\n3,POINT (3 4)\n')
+    monkeypatch.setattr(et, 'STREAM_CHUNKSIZE', 1)
+    et.read_file(str(infile)).extract_to_file(fmt='csv')
+    assert capsys.readouterr().out.splitlines() == [
+                'a,geometry', '1,', '2,POINT (1 2)', '3,POINT (3 4)']
+
+    with pytest.raises(ValueError):
+        test_et.extract_to_file(fmt='xml')
+
+
+def test_optimize(tmp_path):
+    test_et = et.read_file(zip_inf, 'COUNTYFP10')
+    expected = test_et.extract()
+    (before, after) = test_et.optimize()
+    assert after < before
+    extract = test_et.extract()
+    assert extract['TOTPOP'].dtype == np.int16
+    assert extract['STATEFP10'].dtype == 'category'
+    assert extract['NAME10'].dtype == object
+    assert (extract['TOTPOP'] == expected['TOTPOP']).all()
+    assert (test_et.list_values(unique=True) == 
+                expected.index.unique()).all()
+
+    test_et.value = '003'
+    assert len(test_et.extract()) == (expected.index == '003').sum()
+    test_et.extract_to_file(tmp_path / 'out.shp')
+    assert len(gpd.read_file(tmp_path / 'out.shp')) == len(test_et.extract())
+
+    test_et = et.ExtractTable(zip_inf, None, 'COUNTYFP10', '003')
+    test_et.optimize()
+    test_et.value = '001' # re-read in full, then compacted again
+    assert test_et.extract()['TOTPOP'].dtype == np.int16
+
+    small = tmp_path / 'small.csv'
+    pd.DataFrame({'a': [100, 200], 's': ['x', 'x']}).to_csv(small, 
+                                                            index=False)
+    test_et = et.read_file(str(small))
+    (before, after) = test_et.optimize()
+    assert after <= before
+    extract = test_et.extract()
+    assert extract['s'].dtype == object # a categorical would be larger
+    assert (extract['a'] - extract['a'][::-1].values).tolist() == [-100, 100]
+
+    with pytest.raises(RuntimeError):
+        et.ExtractTable(good_inf1, chunksize=2).optimize()
+
+
+def test_partition_by(tmp_path):
+    gdf = et.read_file(zip_inf).extract()
+    counties = gdf['COUNTYFP10'].unique()
+
+    test_et = et.read_file(zip_inf, 'NAME10')
+    paths = test_et.partition_by('COUNTYFP10', 
+                                 str(tmp_path / 'shp' / '{}.shp'))
+    assert sorted(paths) == sorted(counties)
+    for (county, path) in paths.items():
+        part = gpd.read_file(path)
+        assert len(part) == (gdf['COUNTYFP10'] == county).sum()
+        assert (part['COUNTYFP10'] == county).all()
+
+    test_et = et.ExtractTable(good_inf1, None, good_col1a, chunksize=2)
+    paths = test_et.partition_by(good_col1a, str(tmp_path / '{}.csv'))
+    assert sorted(paths) == ['a', 'b', 'c']
+    assert list(pd.read_csv(paths['c'])['col2']) == ['d', '3', '5']
+    paths = test_et.partition_by('col2', str(tmp_path / '{}.pkl'))
+    assert list(pd.read_pickle(paths['d']).index) == ['c']
+
+    with pytest.raises(ValueError):
+        test_et.partition_by(good_col1a, str(tmp_path / 'out.csv'))
+    with pytest.raises(KeyError):
+        test_et.partition_by(bad_col, str(tmp_path / '{}.csv'))
+
+
+def count_rows(gdf):
+    return len(gdf)
+
+
+def test_apply_by():
+    gdf = et.read_file(zip_inf).extract()
+    expected = gdf['COUNTYFP10'].value_counts()
+
+    test_et = et.read_file(zip_inf, 'NAME10')
+    counts = test_et.apply_by('COUNTYFP10', count_rows, workers=2)
+    assert list(counts) == list(gdf['COUNTYFP10'].unique())
+    assert all(counts[county] == expected[county] for county in counts)
+    assert test_et.apply_by('COUNTYFP10', count_rows, workers=1) == counts
+
+    test_et = et.read_file(good_inf1, good_col1a)
+    assert test_et.apply_by(good_col1a, lambda df: list(df['col2']), 
+                            workers=1) == {'a': ['b'], 'c': ['d', '3', '5'], 
+                                           'b': ['10']}
+    with pytest.raises(KeyError):
+        test_et.apply_by(bad_col, count_rows, workers=1)
+    with pytest.raises(ValueError):
+        test_et.apply_by(good_col1a, count_rows, workers=0)
+
+
+def test_geometrize(monkeypatch):
+    wkts = ['POINT ({} {})'.format(i, -i) for i in range(10)]
+    gdf1 = gpd.GeoDataFrame(geometry=list(map(shapely.wkt.loads, wkts)))
+
+    extract = et.ExtractTable(pd.DataFrame({'geometry': wkts})).extract()
+    assert type(extract.geometry) == gpd.GeoSeries
+    assert extract.geometry.geom_equals(gdf1.geometry).all()
+
+    wkbs = pd.DataFrame({'geometry': gdf1.geometry.to_wkb()})
+    extract = et.ExtractTable(wkbs).extract()
+    assert extract.geometry.geom_equals(gdf1.geometry).all()
+
+    monkeypatch.setattr(et, 'GEOMETRIZE_CHUNKSIZE', 3)
+    extract = et.ExtractTable(pd.DataFrame({'geometry': wkts})).extract()
+    assert extract.geometry.geom_equals(gdf1.geometry).all()
+
+
+# To test, remove "no" prefix from function name. Prints rows/sec of 
+# row-at-a-time WKT parsing against ExtractTable's bulk geometrization
+def notest_geometrize_benchmark():
+    n = 1000000
+    wkts = pd.Series(['POINT ({} {})'.format(i, -i) for i in range(n)])
+
+    start = time.perf_counter()
+    wkts.map(shapely.wkt.loads)
+    rowwise = n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    et.ExtractTable(pd.DataFrame({'geometry': wkts})).extract()
+    bulk = n / (time.perf_counter() - start)
+
+    print("row-at-a-time: {:,.0f} rows/sec".format(rowwise))
+    print("bulk:          {:,.0f} rows/sec".format(bulk))
+    assert bulk > rowwise
+
+
 # To test, remove "no" prefix from function name and insert path to large file
 def notest_large(): 
     large_file = ''